@@ -1,13 +1,32 @@
+import time
+_T_START = time.perf_counter()  # início do processo (mede o tempo até o primeiro frame)
+
 import sys, os
-import csv
-import ctypes
+import queue
 import re
+import threading
+from collections import namedtuple
+import ctypes
 import tkinter as tk  # messagebox e utilitários
 from tkinter import messagebox
-from PIL import Image
-from idlelib.tooltip import Hovertip
 import customtkinter as ctk
 
+from resources import resource_path, SAVE_DIR
+from image_cache import ImageCache, image_bytes, snap_size
+from notation_db import load_database
+from output_profiles import PROFILES, DEFAULT_PROFILE, get_profile
+from sprite_atlas import release_atlas
+from theme_packs import BASE_THEME, installed_themes
+from notation_model import NotationModel
+from move_search import MoveSearch
+from layout_scheduler import LayoutScheduler
+from tooltips import TooltipManager
+import profiling
+from profiling import traced
+# notation_renderer / asset_index: importados no primeiro uso
+
+profiling.install_tk_hooks()   # --trace / T8N_TRACE: conta widgets e itens de canvas (senão, nada)
+
 # ------------------ Paleta / Tema ------------------
 BG      = "#1a1038"
 CARD    = "#241645"
@@ -16,23 +35,13 @@ TEXT    = "#e6e6ff"
 SUBTXT  = "#9aa3c7"
 ACCENT  = "#7c3aed"
 
-def resource_path(*parts):
-    """Caminho de recursos empacotados (PyInstaller)."""
-    base = getattr(sys, "_MEIPASS", None)
-    if base:  # executável (onefile/onefolder)
-        return os.path.join(base, *parts)
-    # dev / rodando via .py
-    return os.path.join(os.path.dirname(os.path.abspath(__file__)), *parts)
-
-# Onde SALVAR (persistente). Escolha UMA das opções:
-# 1) ao lado do .exe / projeto:
-APP_DIR = (os.path.dirname(os.path.abspath(sys.executable))
-           if getattr(sys, "frozen", False)
-           else os.path.dirname(os.path.abspath(__file__)))
-SAVE_DIR = os.path.join(APP_DIR, "Saved Notations")
-
-
 
+# Temas conhecidos (rótulo, pasta); só os instalados aparecem no seletor
+THEME_CATALOG = (
+    ("T8 Default", "assets"),
+    ("Xbox", "assets_xbox"),
+    ("PlayStation", "assets_ps"),
+)
 
 # Grade da palette
 PALETTE_MAX_COLS    = 8    # R1..R4 = 8 por linha
@@ -43,16 +52,113 @@ ICON_MIN = 24
 ICON_MAX = 32
 ICON_GAP = 6
 
+# orçamento do cache de imagens da UI (PhotoImage/CTkImage)
+UI_CACHE_BYTES = 24 * 1024 * 1024
+
+# Exportação em segundo plano
+EXPORT_POLL_MS = 100       # leitura dos eventos do worker
+TOAST_MS       = 3500      # tempo de exibição dos avisos
+
+# Preview (virtualizado)
+PREVIEW_ICON       = 32    # px lógicos de cada ícone
+PREVIEW_WRAP       = 17    # ícones por linha visual (linhas maiores quebram; não encolhem)
+PREVIEW_OVERSCAN   = 2     # linhas visuais materializadas além da vista (rolagem suave)
+PREVIEW_WHEEL_ROWS = 24    # px por passo da roda do mouse
+
+# Autocomplete da caixa de notação
+SUGGEST_ROWS  = 8          # sugestões visíveis
+SUGGEST_WIDTH = 420        # px lógicos
+SUGGEST_KEYS  = ("Up", "Down", "Tab", "Return", "KP_Enter", "Escape")
+_CURRENT_WORD = re.compile(r"[^\s,<>]*$")   # trecho sendo digitado (até o cursor)
+# soltar só um modificador (ex.: o Ctrl de Ctrl+Z) não muda o texto: não agenda parse
+MODIFIER_KEYS = {"Control_L", "Control_R", "Shift_L", "Shift_R", "Alt_L", "Alt_R",
+                 "Meta_L", "Meta_R", "Super_L", "Super_R", "Caps_Lock"}
+
+# Carga progressiva da palette (startup)
+PALETTE_BATCH_ROWS = 2     # linhas decodificadas por lote na thread
+PALETTE_SLICE_MS   = 8     # tempo máximo por fatia no thread do Tk
+PALETTE_TICK_MS    = 10    # intervalo entre fatias
+
+
+# ícone da palette: ID da imagem (independe do tema) + nome do golpe (tooltip)
+PaletteIcon = namedtuple("PaletteIcon", "move_id name")
+
+
+def preview_layout(rows, wrap):
+    """Linhas da notação -> linhas visuais (linha, início, fim) de até `wrap` ícones.
+
+    Linha vazia ocupa uma linha visual (como a vírgula no fim da notação). Não toca no Tk.
+    """
+    out = []
+    for r, row in enumerate(rows):
+        n = len(row)
+        out.extend((r, start, min(n, start + wrap)) for start in range(0, n, wrap))
+        if not n:
+            out.append((r, 0, 0))
+    return out
+
+
+def palette_layout_rows(index):
+    """Linhas de PaletteIcon de um AssetIndex: R1..R4 8 por linha por grupo; R5+ 12 costurando.
+
+    Não toca no Tk (usada também pela thread da carga progressiva).
+    """
+    files = [e.filename for e in index.entries if "R9_" not in e.filename]
+
+    # agrupa por prefixo Rn (R1, R2, ...)
+    groups = {}
+    for filename in files:
+        prefix = filename.split('_')[0]  # "R1", "R5", ...
+        groups.setdefault(prefix, []).append(filename)
+
+    def key_group(prefix: str) -> int:
+        try:
+            return int(prefix[1:])
+        except Exception:
+            return 9999
+
+    ordered_groups = sorted(groups.items(), key=lambda kv: key_group(kv[0]))
+
+    def icon(filename):
+        return PaletteIcon(filename, index.by_file[filename].name)
+
+    rows = []
+
+    # Parte A: R1..R4 (8 por linha, por grupo)
+    for prefix, flist in ordered_groups:
+        if key_group(prefix) < 5:
+            flist.sort()
+            for i in range(0, len(flist), PALETTE_MAX_COLS):
+                rows.append([icon(f) for f in flist[i:i + PALETTE_MAX_COLS]])
+
+    # Parte B: R5+ (12 por linha, costurando)
+    tail_files = []
+    for prefix, flist in ordered_groups:
+        if key_group(prefix) >= 5:
+            flist.sort()
+            tail_files.extend(flist)
+    for i in range(0, len(tail_files), SECONDARY_MAX_COLS):
+        rows.append([icon(f) for f in tail_files[i:i + SECONDARY_MAX_COLS]])
+    return rows
+
 
 class ScrollableFrame(ctk.CTkFrame):
-    """Paleta com rolagem vertical para muitos ícones (só vertical)."""
-    def __init__(self, parent):
+    """Paleta com rolagem vertical desenhada num único canvas (só vertical).
+
+    Cada ícone é um item de imagem do canvas; clique e hover são resolvidos pela
+    posição (linha/coluna da grade), então um relayout só move/reescala itens.
+    Seções (ex.: "main", "character") são empilhadas na ordem de `sections`.
+    Com `on_change`, mudar uma seção só avisa o dono, que agenda um único `layout()`;
+    sem ele, o layout é refeito na hora.
+    """
+    PAD = 4                 # mesmo padx/pady da grade de botões
+    HOVER = "#2d1b53"
+
+    def __init__(self, parent, on_click, get_photo, sections=("main", "character"), on_change=None,
+                 tooltips=None):
         super().__init__(parent, fg_color="transparent")
         self.canvas = tk.Canvas(self, highlightthickness=0, bd=0, bg=CARD)
         self.vsb = ctk.CTkScrollbar(self, orientation="vertical", command=self.canvas.yview)
-        self.inner = ctk.CTkFrame(self.canvas, fg_color="transparent")
-
-        self.window = self.canvas.create_window((0, 0), window=self.inner, anchor="nw")
         self.canvas.configure(yscrollcommand=self.vsb.set)
 
         self.canvas.grid(row=0, column=0, sticky="nsew")
@@ -60,11 +166,158 @@ class ScrollableFrame(ctk.CTkFrame):
         self.grid_rowconfigure(0, weight=1)
         self.grid_columnconfigure(0, weight=1)
 
-        self.inner.bind("<Configure>", lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all")))
+        self.on_click = on_click      # on_click(ID)
+        self.get_photo = get_photo    # get_photo(ID, px) -> PhotoImage | None
+        self.on_change = on_change    # on_change() quando as linhas mudam (o dono agenda o layout)
+        self.icon_size = ICON_MAX
+        self._px = ICON_MAX           # px reais do último layout
+        self._filter = None           # IDs visíveis (set) ou None = todos
+        self.sections = {name: [] for name in sections}    # seção -> linhas de PaletteIcon
+        self._item_ids = {name: [] for name in sections}    # seção -> linhas de ids do canvas
+        self.rows = []                # todas as linhas, na ordem de desenho
+        self._row_items = []
+        self._photos = {}             # id do item -> PhotoImage em uso (mantém viva na tela)
+        self._cell = 1
+
+        self._hover = None            # (linha, coluna) sob o mouse
+        self._hover_rect = self.canvas.create_rectangle(0, 0, 0, 0, fill=self.HOVER, width=0, state="hidden")
+        self.tooltips = tooltips if tooltips is not None else TooltipManager(self)   # popup de dica (o do app, se passado)
+
+        self.canvas.bind("<Motion>", self._on_motion)
+        self.canvas.bind("<Leave>", self._on_leave)
+        self.canvas.bind("<Button-1>", self._on_press)
+
+    # ---------- Conteúdo ----------
+    def set_section(self, name, rows):
+        """Troca os ícones de uma seção (cria itens novos só para ela) e refaz o layout."""
+        for ids in self._item_ids[name]:
+            for item in ids:
+                self.canvas.delete(item)
+                self._photos.pop(item, None)
+        self.sections[name] = rows
+        self._item_ids[name] = [[self.canvas.create_image(0, 0, anchor="nw") for _ in row] for row in rows]
+        self._set_hover(None)
+        self._changed()
+
+    def extend_section(self, name, rows):
+        """Acrescenta linhas ao fim de uma seção (carga progressiva) sem recriar as existentes."""
+        rows = list(rows)
+        self.sections[name] = self.sections[name] + rows
+        self._item_ids[name] = self._item_ids[name] + [
+            [self.canvas.create_image(0, 0, anchor="nw") for _ in row] for row in rows]
+        self._changed()
+
+    def _collect(self):
+        """Todas as linhas (e ids do canvas) na ordem de desenho das seções."""
+        self.rows, self._row_items = [], []
+        for name, rows in self.sections.items():
+            self.rows.extend(rows)
+            self._row_items.extend(self._item_ids[name])
+
+    def _changed(self):
+        self._collect()
+        if self.on_change is None:
+            self.layout(self.icon_size)
+        else:
+            self.on_change()
+
+    def max_row_len(self):
+        return max((len(row) for row in self.rows), default=0)
+
+    # ---------- Layout ----------
+    @traced("palette.layout")
+    def layout(self, size):
+        """Posiciona e reescala os itens para ícones de `size` px (lógicos)."""
+        self.icon_size = size
+        scale = self._get_widget_scaling()
+        px = round(size * scale)   # em 1x, um tamanho pré-escalado do atlas (senão, redimensiona uma vez)
+        pad = round(self.PAD * scale)
+        cell = px + 2 * pad
+
+        self._collect()
+        cv = self.canvas
+        for r, (row, ids) in enumerate(zip(self.rows, self._row_items)):
+            for c, (icon, item) in enumerate(zip(row, ids)):
+                photo = self._photos[item] = self.get_photo(icon.move_id, px)
+                cv.itemconfigure(item, image=photo or "", state=self._state(icon))
+                cv.coords(item, c * cell + pad, r * cell + pad)
+        self._px = px
+        self._cell = cell
+        cv.configure(scrollregion=(0, 0, self.max_row_len() * cell, len(self.rows) * cell))
+        if self._hover is not None:
+            self._set_hover(self._hover)
+
+    def refresh_images(self):
+        """Troca só as imagens dos itens (troca de tema); posições e seções ficam como estão."""
+        for row, ids in zip(self.rows, self._row_items):
+            for icon, item in zip(row, ids):
+                photo = self._photos[item] = self.get_photo(icon.move_id, self._px)
+                self.canvas.itemconfigure(item, image=photo or "")
+
+    # ---------- Filtro (busca) ----------
+    def _state(self, icon):
+        return "normal" if self._filter is None or icon.move_id in self._filter else "hidden"
+
+    def set_filter(self, move_ids=None):
+        """Esconde os ícones fora de `move_ids` (None mostra todos). A grade não muda de lugar."""
+        if move_ids == self._filter:
+            return
+        self._filter = move_ids
+        for row, ids in zip(self.rows, self._row_items):
+            for icon, item in zip(row, ids):
+                self.canvas.itemconfigure(item, state=self._state(icon))
+        if self._hover is not None:
+            self._set_hover(None)
+
+    # ---------- Hit-testing ----------
+    def _hit(self, event):
+        """(linha, coluna) do ícone sob o ponteiro, ou None."""
+        x = self.canvas.canvasx(event.x)
+        y = self.canvas.canvasy(event.y)
+        if x < 0 or y < 0:
+            return None
+        r, c = int(y // self._cell), int(x // self._cell)
+        if r < len(self.rows) and c < len(self.rows[r]) and self._state(self.rows[r][c]) == "normal":
+            return r, c
+        return None
+
+    def _set_hover(self, hit):
+        self._hover = hit
+        cv = self.canvas
+        if hit is None:
+            cv.itemconfigure(self._hover_rect, state="hidden")
+            cv.configure(cursor="")
+            return
+        r, c = hit
+        cell = self._cell
+        cv.coords(self._hover_rect, c * cell + 1, r * cell + 1, (c + 1) * cell - 1, (r + 1) * cell - 1)
+        cv.itemconfigure(self._hover_rect, state="normal")
+        cv.tag_lower(self._hover_rect)
+        cv.configure(cursor="hand2")
+
+    def _on_motion(self, event):
+        hit = self._hit(event)
+        if hit == self._hover:
+            return
+        self.tooltips.hide()
+        self._set_hover(hit)
+        if hit is not None:
+            name = self.rows[hit[0]][hit[1]].name
+            if name:
+                self.tooltips.schedule(name)
+
+    def _on_leave(self, event=None):
+        self.tooltips.hide()
+        self._set_hover(None)
+
+    def _on_press(self, event):
+        hit = self._hit(event)
+        if hit is not None:
+            self.on_click(self.rows[hit[0]][hit[1]].move_id)
 
 
 class VirtualKeyboardApp(ctk.CTk):
-    def __init__(self):
+    def __init__(self, progressive=True):
         super().__init__()
 
         # ---- Janela / tema ----
@@ -103,11 +356,9 @@ class VirtualKeyboardApp(ctk.CTk):
                     print("iconphoto falhou:", e2)
 
         # ---- Dados / estado ----
-        self.assets_types = [
-            ("T8 Default", "assets"),
-            ("Xbox", "assets_xbox"),
-            ("PlayStation", "assets_ps"),
-        ]
+        self.assets_types = list(THEME_CATALOG)
+        # temas com pacote/atlas/pasta presentes (os demais não aparecem no seletor)
+        self.theme_options = installed_themes(self.assets_types)
         self.all_characters = [
             "None","Alisa","Asuka","Azucena","Bryan","Claudio","Clive","Devil Jin","Dragunov","Eddy",
             "Fahkumram","Feng","Heihachi","Hwoarang","Jack 8","Jin","Jun","Kazuya","King","Kuma",
@@ -115,41 +366,64 @@ class VirtualKeyboardApp(ctk.CTk):
             "Shaheen","Steve","Victor","Xiaoyu","Yoshimitsu","Zafina",
         ]
 
-        # CSVs
-       #movedict_csv = os.path.join(BASE_DIR, "data", "MoveDictModified.csv")
-        movedict_csv = resource_path("data", "MoveDictModified.csv")
-        with open(movedict_csv, mode='r', encoding='utf-8') as file:
-            self.MoveDict = [row for row in csv.DictReader(file, delimiter=';')]
-
-        #charmoves_csv = os.path.join(BASE_DIR, "data", "CharMoves.csv")
-        charmoves_csv = resource_path("data", "CharMoves.csv")
-        with open(charmoves_csv, mode='r', encoding='utf-8') as file:
-            self.CharMoves = [row for row in csv.DictReader(file, delimiter=';')]
+        # banco de notações compilado (data/notation_db.json; os CSVs não são lidos aqui)
+        self.db = load_database()
+        self.MoveDict = self.db.move_rows()
+        self.CharMoves = self.db.char_rows()
 
         # Mapas para lookup O(1)
-        self.move_to_image = {row["Move"].upper(): row["Image"] for row in self.MoveDict}
-        self.move_to_name  = {row["Move"].upper(): row["Name"]  for row in self.MoveDict}
+        self.move_to_image = self.db.move_to_image
+        self.move_to_name  = self.db.move_to_name
+        self.char_moves_by_name = {row["Character"]: row["Moves"] for row in self.CharMoves}
+
+        # busca por código/nome (autocomplete + filtro da palette), montada uma vez
+        self.move_search = MoveSearch(self.db.moves)
+        self._tips_text = {}          # texto do F1 (two_cols -> texto), montado na primeira abertura
+
+        # índice golpe -> arquivo/_Dark/nome, montado uma vez por pasta de assets; os IDs
+        # (layout da palette, golpes do personagem) vêm do tema padrão e valem para todos
+        self._asset_indexes = {}
+
+        # Renderizador headless (parsing + tiles decodificados, compartilhado com preview/export);
+        # criado no primeiro uso (ver `renderer`), normalmente pela thread da palette
+        self._renderer = None
+        self._renderer_lock = threading.Lock()
 
         # Estado dinâmico
-        self.selected_images_lines = []          # linhas selecionadas no preview
+        self.notation = NotationModel()          # linhas do preview (IDs inteiros) + desfazer/refazer
         self.include_dark = tk.BooleanVar(value=False)
+        self.output_profile_var = tk.StringVar(value=DEFAULT_PROFILE)   # perfil do F4 (output_profiles)
         self.images_folder_var = tk.StringVar(value="T8 Default")
         self.character_var = tk.StringVar(value="None")
         self.selected_assets = self.assets_types[0][1]
-        self.character_image_buttons = []
-        self.tooltips = []
+        self.palette_rows = []        # linhas de PaletteIcon (R1..R4 e R5+)
+        self.character_rows = []      # golpes do personagem (uma linha)
 
-        # cache de imagens (CTkImage) para HiDPI
-        self._img_cache = {}
+        # cache LRU de imagens da UI (CTkImage e PhotoImage), limitado em bytes
+        self._img_cache = ImageCache(UI_CACHE_BYTES, "ui")
+        profiling.add_counter_source("image_cache", self._cache_counters)
         self.current_icon_size = 32
-        self._relayout_id = None
 
-        # Flicker control
-        self._suspend_relayout = False
+        # layout da palette: pedidos (largura, linhas) juntados num único layout por ciclo ocioso
+        self.palette_layout = LayoutScheduler(self, self._layout_palette)
+        profiling.add_counter_source("palette_layout", self.palette_layout.stats)
         self._last_palette_width = 0
 
+        # preview (canvas único, virtualizado): linhas da notação quebradas em linhas visuais de
+        # até `preview_wrap` ícones; só as linhas visuais na vista têm itens no canvas
+        self.preview_wrap = PREVIEW_WRAP
+        self._preview_layout = []     # linha visual -> (linha da notação, início, fim)
+        self._preview_visible = {}    # linha visual -> [(IDs, px), [ids no canvas], [(ID, px, PhotoImage)]]
+        self._preview_placeholder = None
+
+        # exportação em segundo plano (worker criado no primeiro F4)
+        self._export_worker = None
+        self._export_poll_id = None
+
+        # dicas: um popup só para a janela inteira (botões e ícones da palette)
+        self.tooltips = TooltipManager(self)
+
         # widgets
-        self.image_frame = None
         self.preview_frame = None
         self.string_input = None
 
@@ -163,10 +437,18 @@ class VirtualKeyboardApp(ctk.CTk):
         self.character_var.trace_add("write", self.update_character_images)
 
         # carrega paleta e preview inicial
-        self._load_and_group_images()
-        self.update_character_images()
-        self._update_selected_images_display()
-        self._update_preview_field()
+        self.startup_timings = {}
+        self._palette_generation = 0
+        if progressive:
+            # janela (header + entrada) primeiro; palette e golpes do personagem chegam depois
+            self._update_preview_field()
+            self.after(1, self._start_progressive_palette)
+        else:
+            self._load_and_group_images()
+            self.update_character_images()
+            self._update_selected_images_display()
+            self._update_preview_field()
+        self.after_idle(lambda: self.after(0, self._mark_startup, "first_frame"))
 
         # atalho para dicas
         self.bind("<F1>", lambda e: self.show_tips())
@@ -174,10 +456,27 @@ class VirtualKeyboardApp(ctk.CTk):
         self.bind("<F2>", self._hotkey_backspace)   # Backspace: texto ou preview
         self.bind("<F3>", lambda e: self.clear_selected_images())  # Clear
         self.bind("<F4>", lambda e: self.export_images())          # Salvar PNG
-
-
-        # inicia auto-resize da palette
-        self.after(120, self._relayout_palette)
+        self.bind("<Control-z>", self.undo_edit)
+        self.bind("<Control-y>", self.redo_edit)
+        self.bind("<Control-Z>", self.redo_edit)                   # Ctrl+Shift+Z
+
+    @property
+    def renderer(self):
+        """NotationRenderer (import e criação adiados até o primeiro uso; thread-safe)."""
+        if self._renderer is None:
+            with self._renderer_lock:
+                if self._renderer is None:
+                    from notation_renderer import NotationRenderer
+                    self._renderer = NotationRenderer(self.selected_assets, move_dict=self.MoveDict)
+        return self._renderer
+
+    def _mark_startup(self, stage):
+        """Guarda ms desde o início do processo em `startup_timings` (T8N_STARTUP_TIMING=1 imprime)."""
+        ms = (time.perf_counter() - _T_START) * 1000
+        self.startup_timings[stage] = ms
+        profiling.mark(f"startup.{stage}")
+        if os.environ.get("T8N_STARTUP_TIMING"):
+            print(f"[startup] {stage}: {ms:.1f} ms")
 
     # ---------- Helpers de UI ----------
     def _card(self, parent, pad=(10,10)):
@@ -231,6 +530,22 @@ class VirtualKeyboardApp(ctk.CTk):
             variable=self.character_var
         ).grid(row=0, column=1, padx=(0, 12), sticky="ew")
 
+        # Perfil de saída do PNG (fast / small / tiny / web)
+        self._field(
+            left, "Saída",
+            ctk.CTkOptionMenu,
+            values=list(PROFILES), width=110,
+            variable=self.output_profile_var
+        ).grid(row=0, column=2, padx=(0, 12), sticky="w")
+
+        # Tema dos ícones (só os instalados; trocar é re-skin, ver load_and_reload_assets)
+        self._field(
+            left, "Tema",
+            ctk.CTkOptionMenu,
+            values=[label for label, _ in self.theme_options], width=130,
+            variable=self.images_folder_var
+        ).grid(row=0, column=3, padx=(0, 12), sticky="w")
+
         # --- Ícones do topo (com tooltip) ---
         actions = ctk.CTkFrame(right, fg_color="transparent")
         actions.grid(row=0, column=0)
@@ -269,11 +584,11 @@ class VirtualKeyboardApp(ctk.CTk):
         btn_clear.grid(row=0, column=2, padx=6)
         btn_save.grid(row=0, column=3, padx=6)
 
-        # Tooltips
-        Hovertip(btn_tips, "Dicas de uso (F1)", hover_delay=300)
-        Hovertip(btn_back, "Backspace (F2)", hover_delay=300)
-        Hovertip(btn_clear, "Clear (F3)", hover_delay=300)
-        Hovertip(btn_save, "Salvar PNG (F4)", hover_delay=300)
+        # Tooltips (popup único do app)
+        self.tooltips.register(btn_tips, "Dicas de uso (F1)")
+        self.tooltips.register(btn_back, "Backspace (F2)")
+        self.tooltips.register(btn_clear, "Clear (F3)")
+        self.tooltips.register(btn_save, "Salvar PNG (F4)")
 
     # ---------- Entrada ----------
     def _build_input(self):
@@ -285,7 +600,29 @@ class VirtualKeyboardApp(ctk.CTk):
                                          height=56, corner_radius=12)
         self.string_input.grid(row=0, column=0, sticky="ew", padx=8, pady=8)
         self.string_input.bind("<KeyRelease>", self.process_string_input)
+        # autocomplete + filtro da palette: a cada tecla, sem debounce (busca < 1 ms)
+        self.string_input.bind("<KeyRelease>", self._update_suggestions, add=True)
+        for key in SUGGEST_KEYS:
+            self.string_input.bind(f"<{key}>", self._on_suggest_key, add=True)
+        self.string_input.bind("<FocusOut>", lambda e: self.after(150, self._hide_suggestions), add=True)
+        # colar (Ctrl+V ou menu): atualiza já, sem esperar o debounce
+        self.string_input.bind("<<Paste>>", lambda e: self.after_idle(self._parse_and_update))
         self._debounce_id = None
+        self._last_input_len = 0
+        self._parsed_text = ""     # texto da entrada no último parse (mesmo texto -> nada a fazer)
+
+        # trechos não reconhecidos pelo tokenizer (aparece só quando há algum)
+        self.parse_status = ctk.CTkLabel(inner, text="", text_color=SUBTXT, anchor="w")
+        self.parse_status.grid(row=1, column=0, sticky="w", padx=12, pady=(0, 6))
+        self.parse_status.grid_remove()
+
+        # lista de sugestões sobreposta à janela, logo abaixo da caixa (place, só quando há sugestão)
+        self._suggest = tk.Listbox(self, height=SUGGEST_ROWS, activestyle="none", exportselection=False,
+                                   bg=CARD, fg=TEXT, selectbackground=ACCENT, selectforeground=TEXT,
+                                   highlightthickness=1, highlightbackground=BORDER, bd=0,
+                                   font=("Consolas", 12), takefocus=0)
+        self._suggest.bind("<ButtonRelease-1>", lambda e: self._accept_suggestion())
+        self._suggest_hits = []
 
     # ---------- Centro ----------
     def _build_center(self):
@@ -300,14 +637,16 @@ class VirtualKeyboardApp(ctk.CTk):
         left_card.grid(row=0, column=0, sticky="nsew", padx=(0,8), pady=(0,8))
         self._title(left_inner, "Palette").grid(row=0, column=0, sticky="w", padx=10, pady=(10,8))
 
-        self.palette_scroll = ScrollableFrame(left_inner)
+        self.palette_scroll = ScrollableFrame(left_inner, on_click=self.toggle_image,
+                                              get_photo=self._get_tk_photo,
+                                              on_change=lambda: self.palette_layout.invalidate("rows"),
+                                              tooltips=self.tooltips)
         self.palette_scroll.grid(row=1, column=0, sticky="nsew", padx=10)
         left_inner.grid_rowconfigure(1, weight=1)
         left_inner.grid_columnconfigure(0, weight=1)
-        self.image_frame = self.palette_scroll.inner
 
-        # Reage somente a resize real da janela (evita flicker)
-        self.bind("<Configure>", self._on_window_resize)
+        # Reage somente a mudança real de largura da palette (evita flicker)
+        self.palette_scroll.canvas.bind("<Configure>", self._on_palette_resize)
 
         # RIGHT: Preview
         right_card, right_inner = self._card(center)
@@ -319,63 +658,195 @@ class VirtualKeyboardApp(ctk.CTk):
         right_inner.grid_rowconfigure(1, weight=1)
         right_inner.grid_columnconfigure(0, weight=1)
 
-        footer = ctk.CTkLabel(self, text="Tekken 8 Notation Generator • Create and share your combo notations",
+        # um canvas só; cada ícone é um item de imagem (nada de CTkLabel por ícone)
+        self.preview_canvas = tk.Canvas(self.preview_frame, highlightthickness=0, bd=0, bg=CARD)
+        self.preview_vsb = ctk.CTkScrollbar(self.preview_frame, orientation="vertical",
+                                            command=self.preview_canvas.yview)
+        self.preview_canvas.configure(yscrollcommand=self._on_preview_scroll, yscrollincrement=1)
+        self.preview_canvas.bind("<Configure>", lambda e: self._render_preview_viewport())
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.preview_canvas.bind(seq, self._on_preview_wheel)
+        self.preview_canvas.grid(row=0, column=0, sticky="nsew")
+        self.preview_vsb.grid(row=0, column=1, sticky="ns")
+        self.preview_frame.grid_rowconfigure(0, weight=1)
+        self.preview_frame.grid_columnconfigure(0, weight=1)
+
+        footer_row = ctk.CTkFrame(self, fg_color="transparent")
+        footer_row.grid(row=3, column=0, sticky="ew", padx=12, pady=(2, 12))
+        footer_row.grid_columnconfigure(0, weight=1)
+        footer = ctk.CTkLabel(footer_row, text="Tekken 8 Notation Generator • Create and share your combo notations",
                               text_color=SUBTXT)
-        footer.grid(row=3, column=0, pady=(2, 12))
+        footer.grid(row=0, column=0)
+
+        # progresso das exportações em segundo plano (só aparece com jobs na fila)
+        self.export_status = ctk.CTkLabel(footer_row, text="", text_color=TEXT)
+        self.export_status.grid(row=0, column=1, padx=(8, 6))
+        self.export_cancel = ctk.CTkButton(footer_row, text="Cancelar", width=80, height=26,
+                                           fg_color=BORDER, hover_color=ACCENT, command=self.cancel_exports)
+        self.export_cancel.grid(row=0, column=2)
+        self.export_status.grid_remove()
+        self.export_cancel.grid_remove()
+
+        # toast (aviso não modal) sobre a janela
+        self._toast_label = ctk.CTkLabel(self, text="", fg_color=BORDER, text_color=TEXT,
+                                         corner_radius=10, padx=14, pady=8)
+        self._toast_id = None
 
     # ---------- Imagens (CTkImage) ----------
     def _get_ctk_image(self, path, size):
-        key = (path, size)
-        if key in self._img_cache:
-            return self._img_cache[key]
-        if not os.path.exists(path):
+        key = ("ctk", path, size)
+        cimg = self._img_cache.get(key)
+        if cimg is not None:
+            return cimg
+        t = self.renderer.tile(path, round(size[0] * self._get_widget_scaling()))
+        if t is None:
             return None
-        pil = Image.open(path)
+        pil = t[0]
         cimg = ctk.CTkImage(light_image=pil, dark_image=pil, size=size)
-        self._img_cache[key] = cimg
-        return cimg
+        return self._img_cache.put(key, cimg, size[0] * size[1] * 4)
+
+    def _cache_counters(self):
+        """hits/misses dos caches de imagem para o trace (não cria o renderer)."""
+        stats = [self._img_cache.stats()] + (self._renderer.cache_stats() if self._renderer else [])
+        out = {}
+        for s in stats:
+            out[f"{s['name']}.hits"] = s["hits"]
+            out[f"{s['name']}.misses"] = s["misses"]
+        return out
+
+    def image_cache_stats(self):
+        """Contadores dos caches de imagem (UI + renderizador) para diagnóstico."""
+        return [self._img_cache.stats()] + self.renderer.cache_stats()
 
     # ---------- Entrada: parsing com debounce ----------
+    @traced("input.debounce")
     def process_string_input(self, event=None):
+        if event is not None and event.keysym in MODIFIER_KEYS:
+            return
         if getattr(self, "_debounce_id", None):
             try:
                 self.after_cancel(self._debounce_id)
             except Exception:
                 pass
-        self._debounce_id = self.after(120, self._parse_and_update)
+        # mudança grande de uma vez (colagem, seleção substituída): parse imediato;
+        # o parse é incremental por linha, então só a digitação normal usa o debounce
+        n = len(self.string_input.get())
+        jump = abs(n - self._last_input_len) > 1
+        self._last_input_len = n
+        if jump:
+            self._debounce_id = self.after_idle(self._parse_and_update)
+        else:
+            self._debounce_id = self.after(120, self._parse_and_update)
 
+    @traced("input.parse")
     def _parse_and_update(self):
-        input_string = self.string_input.get().upper().strip()
-        line_sequences = [seg for seg in (s.strip() for s in input_string.split(',')) if seg]
-
-        new_lines = []
-        for line in line_sequences:
-            tokens = [t for t in re.split(r'[\s]+', line) if t]
-            images_line = []
-            for sequence in tokens:
-                img_name = self.move_to_image.get(sequence)
-                if img_name:
-                    images_line.append(img_name)
-            #images_line_paths = [os.path.join(BASE_DIR, self.selected_assets, image.strip())
-            images_line_paths = [resource_path(self.selected_assets, image.strip()) for image in images_line]
-                #for image in images_line]
-            new_lines.append(images_line_paths)
-
-        if new_lines == self.selected_images_lines:
+        text = self.string_input.get()
+        self._last_input_len = len(text)
+        # texto igual ao do último parse (soltar Ctrl+Z/Ctrl+Y, setas...): reaplicá-lo desfaria
+        # o desfazer/refazer e as edições por clique
+        if text == self._parsed_text:
             return
+        self._parsed_text = text
+        result = self.renderer.parse(text)
+        self._show_unknown(result.unknown)
 
-        self.selected_images_lines = new_lines
-        self._update_selected_images_display()
+        # só as linhas que mudaram entram no histórico; nada mudou -> nada a redesenhar
+        if self.notation.set_lines(result.lines, text):
+            self._update_selected_images_display()
+
+    # ---------- Autocomplete / filtro ----------
+    def _current_word(self):
+        """(início, trecho) do que está sendo digitado antes do cursor."""
+        text = self.string_input.get()[:self.string_input.index(tk.INSERT)]
+        m = _CURRENT_WORD.search(text)
+        return m.start(), m.group()
+
+    @traced("input.suggest")
+    def _update_suggestions(self, event=None):
+        if event is not None and event.keysym in SUGGEST_KEYS:
+            return
+        _, word = self._current_word()
+        hits = self.move_search.search(word, SUGGEST_ROWS) if word else []
+        if not hits:
+            self._hide_suggestions()
+            return
+        self.palette_scroll.set_filter(self.move_search.images(word))
+        self._suggest_hits = hits
+        lb = self._suggest
+        lb.delete(0, tk.END)
+        for h in hits:
+            lb.insert(tk.END, f"{h.move:<10} {h.name}")
+        lb.configure(height=len(hits))
+        lb.selection_set(0)
+        entry = self.string_input
+        lb.place(x=entry.winfo_rootx() - self.winfo_rootx() + round(12 * self._get_widget_scaling()),
+                 y=entry.winfo_rooty() - self.winfo_rooty() + entry.winfo_height(),
+                 width=round(SUGGEST_WIDTH * self._get_widget_scaling()))
+        lb.lift()
+
+    def _hide_suggestions(self):
+        self._suggest_hits = []
+        self._suggest.place_forget()
+        self.palette_scroll.set_filter(None)
+
+    def _on_suggest_key(self, event):
+        """Setas escolhem, Tab/Enter aceitam, Esc fecha; sem lista aberta, a tecla segue normal."""
+        if not self._suggest_hits:
+            return None
+        if event.keysym == "Escape":
+            self._hide_suggestions()
+        elif event.keysym in ("Up", "Down"):
+            lb = self._suggest
+            i = (lb.curselection() or (0,))[0] + (1 if event.keysym == "Down" else -1)
+            i = max(0, min(len(self._suggest_hits) - 1, i))
+            lb.selection_clear(0, tk.END)
+            lb.selection_set(i)
+            lb.see(i)
+        else:
+            self._accept_suggestion()
+        return "break"
+
+    def _accept_suggestion(self):
+        """Troca o trecho digitado pelo código escolhido (+ espaço) e atualiza o preview já."""
+        if not self._suggest_hits:
+            return
+        i = (self._suggest.curselection() or (0,))[0]
+        move = self._suggest_hits[i].move
+        start, _ = self._current_word()
+        end = self.string_input.index(tk.INSERT)
+        self.string_input.delete(start, end)
+        self.string_input.insert(start, move + " ")
+        self.string_input.icursor(start + len(move) + 1)
+        self.string_input.focus_set()
+        self._hide_suggestions()
+        self._parse_and_update()
+
+    def _show_unknown(self, unknown):
+        """Mostra abaixo da caixa os trechos que não viraram comando (com a posição)."""
+        if not unknown:
+            self.parse_status.grid_remove()
+            return
+        shown = ", ".join(f"'{u.text}' (pos {u.start + 1})" for u in unknown[:6])
+        if len(unknown) > 6:
+            shown += f" … +{len(unknown) - 6}"
+        self.parse_status.configure(text=f"Não reconhecido: {shown}")
+        self.parse_status.grid()
 
     # ---------- Utilidades de dados ----------
     def find_move_name(self, file_name):
         return self.move_to_name.get(file_name.upper())
 
     def find_character_moves(self, character_name):
-        for data in self.CharMoves:
-            if data['Character'] == character_name:
-                return data['Moves']
-        return None
+        return self.char_moves_by_name.get(character_name)
+
+    def asset_index(self, folder=None):
+        """AssetIndex da pasta (padrão: tema padrão, referência dos IDs); criado só na primeira vez."""
+        folder = folder or BASE_THEME
+        index = self._asset_indexes.get(folder)
+        if index is None:
+            from asset_index import AssetIndex
+            index = self._asset_indexes[folder] = AssetIndex(folder, self.MoveDict, self.CharMoves)
+        return index
     ###
     def _build_notations_from_csv_pretty(
     self, *, two_cols=True, max_items=None,
@@ -417,6 +888,7 @@ class VirtualKeyboardApp(ctk.CTk):
 
     ###
     # ---------- Atualiza botões do personagem ----------
+    @traced("character.switch")
     def update_character_images(self, *_):
         selected_character = self.character_var.get().strip()
 
@@ -433,8 +905,8 @@ class VirtualKeyboardApp(ctk.CTk):
                 self.character_image_button.configure(state="normal", text="", image=cimg,
                                                       command=self.add_character_image)
                 self.character_image_button.image = cimg'''
-            if os.path.exists(char_image_path):
-                cimg = self._get_ctk_image(char_image_path, (48, 48))
+            cimg = self._get_ctk_image(char_image_path, (48, 48))
+            if cimg is not None:
                 # sem ação ao clicar
                 self.character_image_button.configure(state="normal", text="", image=cimg)
                 self.character_image_button.configure(command=None)  # garante que não faz nada ao clicar
@@ -444,288 +916,162 @@ class VirtualKeyboardApp(ctk.CTk):
                 self.character_image_button.configure(state="disabled", text="(Character)", image=None)
                 self.character_image_button.image = None
 
-        # Limpa botões anteriores
-        for row in getattr(self, "character_image_buttons", []):
-            for b in row:
-                b.grid_forget()
-        self.character_image_buttons = []
-        self.tooltips = []
+        # Limpa os golpes anteriores
+        self.character_rows = []
+        self.palette_scroll.set_section("character", [])
 
         if selected_character == "None":
             self._update_preview_field()
-            self._relayout_palette()
             return
 
-        char_moves_str = self.find_character_moves(selected_character)
-        if not char_moves_str:
+        # golpes já resolvidos no índice (sem listar a pasta); todos numa linha só
+        char_row = [PaletteIcon(e.filename, e.name)
+                    for e in self.asset_index().character(selected_character)]
+        if not char_row:
             self._update_preview_field()
-            self._relayout_palette()
             return
 
-        char_moves = sorted(char_moves_str.split(", "))
-        #assets_dir = os.path.join(BASE_DIR, self.selected_assets)
-        assets_dir = resource_path(self.selected_assets)
-        column_index = 0
-        for move in char_moves:
-            button_row = []
-            for filename in os.listdir(assets_dir):
-                if "_Dark" in filename or not filename.lower().endswith(".png"):
-                    continue
-                if move == filename[3:][:-4]:
-                    image_path = os.path.join(assets_dir, filename)
-                    cimg = self._get_ctk_image(image_path, (self.current_icon_size, self.current_icon_size))
-                    button = ctk.CTkButton(
-                        self.image_frame, image=cimg, text="",
-                        width=self.current_icon_size, height=self.current_icon_size,
-                        fg_color="transparent", hover_color="#2d1b53",
-                        command=lambda p=image_path: self.toggle_image(p)
-                    )
-                    button.image = cimg
-                    button._image_path = image_path
-                    button_row.append(button)
-
-                    move_name = self.find_move_name(filename[3:][:-4])
-                    if move_name:
-                        try:
-                            self.tooltips.append(Hovertip(button, move_name, hover_delay=300))
-                        except Exception:
-                            pass
-
-            self.character_image_buttons.append(button_row)
-            for i, b in enumerate(button_row):
-                row_base = getattr(self, "_palette_rows_used", 8)
-                b.grid(row=row_base, column=column_index, padx=4, pady=4)
-                column_index += 1
+        self.character_rows = [char_row] if char_row else []
+        self.palette_scroll.set_section("character", self.character_rows)
 
         self._update_preview_field()
-        self._relayout_palette()
 
     def add_character_image(self):
         selected_character = self.character_var.get().strip()
         if selected_character == "None":
             return
-        #char_image_path = os.path.join(BASE_DIR, "char", selected_character + ".png")
-        char_image_path = resource_path("char", selected_character + ".png")
-        if os.path.exists(char_image_path):
-            if self.selected_images_lines:
-                self.selected_images_lines[-1].append(char_image_path)
-            else:
-                self.selected_images_lines = [[char_image_path]]
+        # ID com pasta: o retrato não depende do tema
+        char_image_id = "char/" + selected_character + ".png"
+        from sprite_atlas import image_exists
+        if image_exists(self.renderer.path(char_image_id)):
+            self.notation.append(char_image_id)
             self._update_selected_images_display()
 
     # ---------- Troca de assets ----------
+    @traced("theme.switch")
     def load_and_reload_assets(self, *_):
+        """Troca de tema = re-skin: palette, golpes do personagem e preview guardam IDs, então
+        só as imagens dos itens existentes mudam (nada é recriado)."""
         value_to_find = self.images_folder_var.get()
-        index = next(i for i, option in enumerate(self.assets_types) if option[0] == value_to_find)
-        new_asset_folder = self.assets_types[index][1]
-
-        tmp = []
-        for line in self.selected_images_lines:
-            tmp_line = []
-            for item in line:
-                #old = os.path.join(BASE_DIR, self.selected_assets)
-                #new = os.path.join(BASE_DIR, new_asset_folder)
-                old = resource_path(self.selected_assets)
-                new = resource_path(new_asset_folder)
-                tmp_line.append(item.replace(old, new))
-            tmp.append(tmp_line)
-        self.selected_images_lines = tmp
-        self.selected_assets = new_asset_folder
-
-        # reconstrói a paleta
-        for child in self.image_frame.winfo_children():
-            child.destroy()
-        self._load_and_group_images()
-        self.update_character_images()
-        self._update_selected_images_display()
-
-    # ---------- Auto-resize da palette ----------
-    def _on_window_resize(self, event):
-        # só trata o próprio toplevel (janela) e quando muda largura de verdade
-        if event.widget is not self:
+        new_asset_folder = next((folder for label, folder in self.theme_options if label == value_to_find), None)
+        if new_asset_folder is None or new_asset_folder == self.selected_assets:
             return
-        w = self.image_frame.winfo_width()
-        if abs(w - self._last_palette_width) >= 8:
-            self._last_palette_width = w
-            self._relayout_palette()
-
-    def _relayout_palette(self):
-        # trava durante preview
-        if self._suspend_relayout:
-            return
-        if getattr(self, "_relayout_id", None) is not None:
-            try:
-                self.after_cancel(self._relayout_id)
-            except Exception:
-                pass
-        self._relayout_id = self.after(60, self._relayout_palette_now)
+        old_asset_folder = self.selected_assets
+        self.selected_assets = new_asset_folder
+        self.renderer.assets = new_asset_folder   # o pacote do tema é lido aqui, no primeiro uso
 
-    def _relayout_palette_now(self):
-        if self._suspend_relayout:
-            self._relayout_id = self.after(60, self._relayout_palette_now)
-            return
+        self.palette_scroll.refresh_images()
+        self._reskin_preview()
 
-        container = self.image_frame
-        avail = max(0, container.winfo_width() - 16)
-        if avail <= 0:
-            self._relayout_id = self.after(80, self._relayout_palette_now)
-            return
+        # o tema anterior sai da memória (tiles da UI, caches do renderer, folhas do atlas/pacote)
+        def in_old_theme(key):   # ("photo" | "ctk", caminho, tamanho)
+            return os.path.basename(os.path.dirname(key[1])) == old_asset_folder
+        self._img_cache.discard(in_old_theme)
+        self.renderer.drop_assets(old_asset_folder)
+        release_atlas(old_asset_folder)
 
-        max_row_len = 0
-        for row in getattr(self, "image_buttons", []):
-            max_row_len = max(max_row_len, len(row))
-        for row in getattr(self, "character_image_buttons", []):
-            max_row_len = max(max_row_len, len(row))
-        if max_row_len == 0:
-            return
+    # ---------- Auto-resize da palette ----------
+    def _on_palette_resize(self, event):
+        # só quando a largura muda de verdade (o canvas também recebe <Configure> de altura)
+        if abs(event.width - self._last_palette_width) >= 8:
+            self._last_palette_width = event.width
+            self.palette_layout.invalidate("width")
+
+    @traced("palette.relayout")
+    def _layout_palette(self, dirty):
+        """Roda pelo LayoutScheduler (no máximo uma vez por ciclo ocioso). False = nada mudou.
+
+        "rows" (seções trocadas): sempre refaz a grade. "width": só refaz se o tamanho dos
+        ícones mudar.
+        """
+        scroll = self.palette_scroll
+        # largura em px lógicos (o canvas mede px reais); 0 = ainda não mapeado
+        avail = max(0, int(scroll.canvas.winfo_width() / self._get_widget_scaling()) - 16)
+        max_row_len = scroll.max_row_len()
+        if avail <= 0 or max_row_len == 0:
+            # guarda os motivos: o <Configure> do canvas (ou a próxima seção) roda o layout
+            self.palette_layout.defer(dirty)
+            return False
 
         size_by_width = int((avail - (max_row_len - 1) * ICON_GAP) / max_row_len)
-        new_size = max(ICON_MIN, min(ICON_MAX, size_by_width))
-        if new_size == self.current_icon_size:
-            return
+        new_size = snap_size(max(ICON_MIN, min(ICON_MAX, size_by_width)))
+        if "rows" not in dirty and new_size == scroll.icon_size:
+            return False
 
         self.current_icon_size = new_size
         self._apply_icon_size(new_size)
+        return True
 
+    @traced("palette.apply_icon_size")
     def _apply_icon_size(self, size: int):
-        # palette
-        for row in getattr(self, "image_buttons", []):
-            for btn in row:
-                path = getattr(btn, "_image_path", None)
-                if not path:
-                    continue
-                cimg = self._get_ctk_image(path, (size, size))
-                btn.configure(image=cimg, width=size, height=size)
-                btn.image = cimg
-        # moves do personagem
-        for row in getattr(self, "character_image_buttons", []):
-            for btn in row:
-                path = getattr(btn, "_image_path", None)
-                if not path:
-                    continue
-                cimg = self._get_ctk_image(path, (size, size))
-                btn.configure(image=cimg, width=size, height=size)
-                btn.image = cimg
+        # palette + moves do personagem: só move/reescala itens do canvas
+        self.palette_scroll.layout(size)
 
     # ---------- Montagem da palette ----------
+    @traced("palette.build")
     def _load_and_group_images(self):
         """R1..R4: 8 por linha por grupo; R5+: 12 por linha costurando."""
-        #assets_dir = os.path.join(BASE_DIR, self.selected_assets)
-        assets_dir = resource_path(self.selected_assets)
-        if not os.path.isdir(assets_dir):
-            self.image_buttons = []
-            self._palette_rows_used = 0
-            return
-
-        files = [f for f in sorted(os.listdir(assets_dir)) if f.lower().endswith(".png")]
-        files = [f for f in files if "_Dark" not in f and "R9_" not in f]
-
-        # limpa a área da palette
-        for child in self.image_frame.winfo_children():
-            child.destroy()
-
-        # agrupa por prefixo Rn (R1, R2, ...)
-        groups = {}
-        for filename in files:
-            try:
-                prefix = filename.split('_')[0]  # "R1", "R5", ...
-            except Exception:
-                continue
-            groups.setdefault(prefix, []).append(filename)
-
-        def key_group(prefix: str) -> int:
-            try:
-                return int(prefix[1:])
-            except Exception:
-                return 9999
-
-        ordered_groups = sorted(groups.items(), key=lambda kv: key_group(kv[0]))
-
-        self.image_buttons = []
-        current_row = 0
-
-        # Parte A: R1..R4 (8 por linha, por grupo)
-        early_groups = [(p, flist) for (p, flist) in ordered_groups if key_group(p) < 5]
-        for prefix, flist in early_groups:
-            flist.sort()
-            for idx, filename in enumerate(flist):
-                row = current_row + (idx // PALETTE_MAX_COLS)
-                col = idx % PALETTE_MAX_COLS
-
-                while len(self.image_buttons) <= row:
-                    self.image_buttons.append([])
-
-                image_path = os.path.join(assets_dir, filename)
-                cimg = self._get_ctk_image(image_path, (self.current_icon_size, self.current_icon_size))
-                btn = ctk.CTkButton(
-                    self.image_frame, image=cimg, text="",
-                    width=self.current_icon_size, height=self.current_icon_size,
-                    fg_color="transparent", hover_color="#2d1b53",
-                    command=lambda p=image_path: self.toggle_image(p)
-                )
-                btn.image = cimg
-                btn._image_path = image_path
-                btn.grid(row=row, column=col, padx=4, pady=4)
-                self.image_buttons[row].append(btn)
-
-                try:
-                    file_name = filename[6:][:-4]
-                    move_name = self.find_move_name(file_name)
-                    if move_name:
-                        self.tooltips.append(Hovertip(btn, move_name, hover_delay=300))
-                except Exception:
-                    pass
-
-            rows_used = (len(flist) + PALETTE_MAX_COLS - 1) // PALETTE_MAX_COLS
-            current_row += rows_used
-
-        # Parte B: R5+ (12 por linha, costurando)
-        tail_files = []
-        for prefix, flist in ordered_groups:
-            if key_group(prefix) >= 5:
-                flist.sort()
-                tail_files.extend(flist)
-
-        for i, filename in enumerate(tail_files):
-            row = current_row + (i // SECONDARY_MAX_COLS)
-            col = i % SECONDARY_MAX_COLS
-
-            while len(self.image_buttons) <= row:
-                self.image_buttons.append([])
-
-            image_path = os.path.join(assets_dir, filename)
-            cimg = self._get_ctk_image(image_path, (self.current_icon_size, self.current_icon_size))
-            btn = ctk.CTkButton(
-                self.image_frame, image=cimg, text="",
-                width=self.current_icon_size, height=self.current_icon_size,
-                fg_color="transparent", hover_color="#2d1b53",
-                command=lambda p=image_path: self.toggle_image(p)
-            )
-            btn.image = cimg
-            btn._image_path = image_path
-            btn.grid(row=row, column=col, padx=4, pady=4)
-            self.image_buttons[row].append(btn)
-
+        self._palette_generation += 1     # descarta lotes de uma carga progressiva em curso
+        rows = palette_layout_rows(self.asset_index())
+
+        # desenha no canvas (itens de imagem, sem widgets por ícone); o layout sai no próximo ciclo ocioso
+        self.palette_rows = rows
+        self.palette_scroll.set_section("main", rows)
+
+    # ---------- Carga progressiva (startup) ----------
+    def _start_progressive_palette(self):
+        """Decodifica a palette numa thread e desenha em lotes pequenos no thread do Tk."""
+        self._mark_startup("window_built")
+        self._palette_generation += 1
+        gen = self._palette_generation
+        px = round(self.palette_scroll.icon_size * self._get_widget_scaling())  # = layout()
+        q = queue.Queue()
+        threading.Thread(target=self._decode_palette_worker,
+                         args=(px, gen, q), daemon=True).start()
+        self.after(PALETTE_TICK_MS, self._drain_palette_queue, q, gen)
+
+    def _decode_palette_worker(self, px, gen, q):
+        """Thread: índice + linhas da palette + tiles já decodificados. Nenhuma chamada ao Tk aqui."""
+        try:
+            rows = palette_layout_rows(self.asset_index())
+            renderer = self.renderer
+            for i in range(0, len(rows), PALETTE_BATCH_ROWS):
+                batch = rows[i:i + PALETTE_BATCH_ROWS]
+                for row in batch:
+                    for icon in row:
+                        renderer.tile(renderer.path(icon.move_id), px)   # aquece o cache do renderer
+                q.put((gen, batch))
+        finally:
+            q.put(None)
+
+    def _drain_palette_queue(self, q, gen):
+        """Thread do Tk: consome lotes por no máximo PALETTE_SLICE_MS e reagenda."""
+        if gen != self._palette_generation:
+            return  # assets trocados no meio da carga: a palette já foi montada de novo
+        deadline = time.perf_counter() + PALETTE_SLICE_MS / 1000
+        while time.perf_counter() < deadline:
             try:
-                file_name = filename[6:][:-4]
-                move_name = self.find_move_name(file_name)
-                if move_name:
-                    self.tooltips.append(Hovertip(btn, move_name, hover_delay=300))
-            except Exception:
-                pass
-
-        rows_used_tail = (len(tail_files) + SECONDARY_MAX_COLS - 1) // SECONDARY_MAX_COLS
-        self._palette_rows_used = current_row + rows_used_tail
-
-        # auto-ajuste
-        self._relayout_palette()
+                item = q.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._finish_progressive_palette()
+                return
+            _, batch = item
+            if not self.palette_rows:
+                self._mark_startup("palette_first_batch")
+            self.palette_rows.extend(batch)
+            self.palette_scroll.extend_section("main", batch)
+        self.after(PALETTE_TICK_MS, self._drain_palette_queue, q, gen)
+
+    def _finish_progressive_palette(self):
+        self.update_character_images()
+        self._update_selected_images_display()
+        self._mark_startup("palette_ready")
 
     # ---------- Ações ----------
-    def toggle_image(self, image_path):
-        if self.selected_images_lines:
-            self.selected_images_lines[-1].append(image_path)
-        else:
-            self.selected_images_lines = [[image_path]]
+    def toggle_image(self, move_id):
+        self.notation.append(move_id)
         self._update_selected_images_display()
 
     def _hotkey_backspace(self, event=None):
@@ -745,12 +1091,45 @@ class VirtualKeyboardApp(ctk.CTk):
         return "break"
 
     def remove_last_image(self):
-        if self.selected_images_lines:
-            if self.selected_images_lines[-1]:
-                self.selected_images_lines[-1].pop()
-                if len(self.selected_images_lines[-1]) == 0:
-                    self.selected_images_lines.pop()
-        self._update_selected_images_display()
+        if self.notation.pop():
+            self._update_selected_images_display()
+
+    def undo_edit(self, event=None):
+        """Ctrl+Z: desfaz a última edição do preview (clique, digitação, backspace, clear)."""
+        self._flush_pending_parse()
+        if self.notation.undo():
+            self._restore_entry_text()
+            self._update_selected_images_display()
+        return "break"
+
+    def redo_edit(self, event=None):
+        """Ctrl+Y / Ctrl+Shift+Z."""
+        self._flush_pending_parse()
+        if self.notation.redo():
+            self._restore_entry_text()
+            self._update_selected_images_display()
+        return "break"
+
+    def _flush_pending_parse(self):
+        """Digitação ainda no debounce vira edição agora (para o desfazer enxergá-la)."""
+        if getattr(self, "_debounce_id", None):
+            try:
+                self.after_cancel(self._debounce_id)
+            except Exception:
+                pass
+            self._debounce_id = None
+        self._parse_and_update()
+
+    def _restore_entry_text(self):
+        """Desfazer/refazer: a caixa volta ao texto da edição (parser e guarda de parse juntos)."""
+        text = self.notation.text
+        if self.string_input.get() != text:
+            self.string_input.delete(0, tk.END)
+            self.string_input.insert(0, text)
+        self._parsed_text = text
+        self._last_input_len = len(text)
+        # o parser incremental passa a ter em cache as linhas do texto restaurado
+        self._show_unknown(self.renderer.parse(text).unknown)
 
     def clear_selected_images(self):
         # limpa a caixa de digitação também
@@ -758,55 +1137,151 @@ class VirtualKeyboardApp(ctk.CTk):
             self.string_input.delete(0, tk.END)
         except Exception:
             pass
-        self.selected_images_lines = []
+        self._parsed_text = ""
+        self._last_input_len = 0
+        self.notation.clear()
         self._update_selected_images_display()
-        self._update_preview_field()
 
     def _update_selected_images_display(self):
-        for row_buttons in getattr(self, "image_buttons", []):
-            for b in row_buttons:
-                try:
-                    b.configure(state="normal")
-                except Exception:
-                    pass
         self._update_preview_field()
 
+    def _get_tk_photo(self, move_id, px):
+        """PhotoImage (pixels reais) de um ID no tema atual para os canvas; None se a imagem não existe.
+
+        Quem desenha guarda a referência enquanto o item existir: uma expulsão do LRU
+        só tira a imagem do cache, não da tela.
+        """
+        path = self.renderer.path(move_id)
+        key = ("photo", path, px)
+        photo = self._img_cache.get(key)
+        if photo is None:
+            t = self.renderer.tile(path, px)
+            if t is None:
+                return None
+            from PIL import ImageTk
+            photo = self._img_cache.put(key, ImageTk.PhotoImage(t[0], master=self), image_bytes(t[0]))
+            profiling.count("ui.photos_created")
+        return photo
+
+    @traced("preview.update")
     def _update_preview_field(self):
-        # trava relayout da palette durante a recriação do preview
-        self._suspend_relayout = True
-        try:
-            for w in self.preview_frame.winfo_children():
-                w.destroy()
-
-            if not self.selected_images_lines or all(len(line)==0 for line in self.selected_images_lines):
-                ph = ctk.CTkLabel(self.preview_frame,
-                                  text="Nenhuma notação selecionada.\nClique nos ícones ou digite os códigos.",
-                                  text_color=SUBTXT, justify="center")
-                ph.grid(row=0, column=0, padx=12, pady=12, sticky="n")
-                return
-
-            max_width = 17 * 32
-            for r, line in enumerate(self.selected_images_lines):
-                total = len(line) * 32
-                scaled = max(28, int(32 * (max_width/total))) if total > max_width and len(line)>0 else 32 # 60 para 32
-                for c, image_path in enumerate(line):
-                    if not os.path.exists(image_path):
-                        continue
-                    cimg = self._get_ctk_image(image_path, (scaled, scaled))
-                    lbl = ctk.CTkLabel(self.preview_frame, image=cimg, text="")
-                    lbl.image = cimg
-                    lbl.grid(row=r, column=c, padx=1, pady=2, sticky="w")
-        finally:
-            self._suspend_relayout = False
-            self.after(1, self._relayout_palette)
+        """Preview virtualizado: recalcula a quebra das linhas e desenha só o que está visível."""
+        cv = self.preview_canvas
+        if self.notation.is_empty():
+            self._clear_preview_rows()
+            self._preview_layout = []
+            cv.configure(scrollregion=(0, 0, 0, 0))
+            cv.yview_moveto(0)
+            if self._preview_placeholder is None:
+                self._preview_placeholder = cv.create_text(
+                    12, 12, anchor="nw", fill=SUBTXT, justify="center",
+                    text="Nenhuma notação selecionada.\nClique nos ícones ou digite os códigos.")
+            return
+        if self._preview_placeholder is not None:
+            cv.delete(self._preview_placeholder)
+            self._preview_placeholder = None
+
+        self._preview_layout = preview_layout(self.notation.rows, self.preview_wrap)
+        px, cell_w, row_h = self._preview_metrics()
+        cv.configure(scrollregion=(0, 0, self.preview_wrap * cell_w, len(self._preview_layout) * row_h))
+        self._render_preview_viewport()
+
+    def _preview_metrics(self):
+        """(px do tile, largura da célula, altura da linha visual) em px reais."""
+        scale = self._get_widget_scaling()
+        px = round(PREVIEW_ICON * scale)
+        return px, px + 2 * round(1 * scale), px + 2 * round(2 * scale)
+
+    def _on_preview_scroll(self, first, last):
+        """yscrollcommand do canvas: atualiza a barra e materializa as linhas que entraram na vista."""
+        self.preview_vsb.set(first, last)
+        self._render_preview_viewport()
+
+    def _on_preview_wheel(self, event):
+        if self.preview_canvas.yview() == (0.0, 1.0):
+            return
+        step = -1 if (event.num == 4 or event.delta > 0) else 1
+        self.preview_canvas.yview_scroll(step * PREVIEW_WHEEL_ROWS, "units")
+
+    @traced("preview.viewport")
+    def _render_preview_viewport(self):
+        """Cria/atualiza os itens das linhas visuais na vista (+ margem) e apaga os de fora.
+
+        O custo é proporcional à área visível: uma linha visual já desenhada com o mesmo
+        conteúdo e tamanho fica intacta; as demais reaproveitam os itens do canvas.
+        """
+        cv, layout = self.preview_canvas, self._preview_layout
+        if not layout:
+            return
+        px, cell_w, row_h = self._preview_metrics()
+        pad_x, pad_y = (cell_w - px) // 2, (row_h - px) // 2
+        top = cv.canvasy(0)
+        first = max(0, int(top // row_h) - PREVIEW_OVERSCAN)
+        last = min(len(layout), int((top + cv.winfo_height()) // row_h) + 1 + PREVIEW_OVERSCAN)
+
+        visible = self._preview_visible
+        for v in [v for v in visible if not first <= v < last]:
+            for item in visible.pop(v)[1]:
+                cv.delete(item)
+
+        rows, name = self.notation.rows, self.notation.ids.name
+        for v in range(first, last):
+            r, start, end = layout[v]
+            key = (rows[r][start:end], px)
+            entry = visible.get(v)
+            if entry is not None and entry[0] == key:
+                continue   # linha visual inalterada
+            if entry is None:
+                entry = visible[v] = [None, [], []]
+            items, tiles = entry[1], entry[2]
+            y = v * row_h + pad_y
+            for n, i in enumerate(key[0]):
+                move_id = name(i)
+                if n < len(tiles) and tiles[n][0] == move_id and tiles[n][1] == px:
+                    cv.coords(items[n], pad_x + n * cell_w, y)
+                    continue
+                photo = self._get_tk_photo(move_id, px)
+                if n < len(items):
+                    cv.itemconfigure(items[n], image=photo or "")
+                    cv.coords(items[n], pad_x + n * cell_w, y)
+                    tiles[n] = (move_id, px, photo)
+                else:
+                    items.append(cv.create_image(pad_x + n * cell_w, y, image=photo or "", anchor="nw"))
+                    tiles.append((move_id, px, photo))
+            for item in items[len(key[0]):]:
+                cv.delete(item)
+            del items[len(key[0]):], tiles[len(key[0]):]
+            entry[0] = key
+
+    def _reskin_preview(self):
+        """Troca a imagem de cada tile materializado pela do tema atual (mesmos itens e posições)."""
+        for _, items, tiles in self._preview_visible.values():
+            for n, (item, (move_id, px, _)) in enumerate(zip(items, tiles)):
+                photo = self._get_tk_photo(move_id, px)
+                self.preview_canvas.itemconfigure(item, image=photo or "")
+                tiles[n] = (move_id, px, photo)
+
+    def _clear_preview_rows(self):
+        """Remove do canvas todas as linhas materializadas do preview."""
+        for _, items, _ in self._preview_visible.values():
+            for item in items:
+                self.preview_canvas.delete(item)
+        self._preview_visible.clear()
 
     # ---------- Dicas ----------
+    def _notations_text(self, two_cols):
+        """Lista de notações do F1 (montada uma vez; o banco não muda com o app aberto)."""
+        text = self._tips_text.get(two_cols)
+        if text is None:
+            text = self._tips_text[two_cols] = self._build_notations_from_csv_pretty(two_cols=two_cols)
+        return text
+
     def show_tips(self):
         """Abre a janela de dicas, com notations em 2 colunas alinhadas."""
         header = (
-            "• Digite a notação na caixa (separe comandos com espaço; use vírgula para nova linha).\n"
+            "• Digite a notação na caixa (espaços são opcionais, ex.: df2fh; use vírgula para nova linha).\n"
             "• Clique nos ícones da Palette para adicionar ao Preview.\n"
-            "• Atalhos: F1 = Dicas | F2 = Backspace | F3 = Clear | F4 = Salvar PNG\n"
+            "• Atalhos: F1 = Dicas | F2 = Backspace | F3 = Clear | F4 = Salvar PNG | Ctrl+Z / Ctrl+Y = Desfazer / Refazer\n"
             "• Itens Criados vão para pasta Saved Notation\n"
             "\n"
             "NOTATIONS TO TYPE\n"
@@ -830,7 +1305,7 @@ class VirtualKeyboardApp(ctk.CTk):
             box.pack(padx=16, pady=8, fill="both", expand=True)
 
             box.insert("1.0", header)
-            box.insert("end", self._build_notations_from_csv_pretty(two_cols=True))
+            box.insert("end", self._notations_text(two_cols=True))
             box.configure(state="disabled")
 
             ctk.CTkButton(top, text="Fechar", fg_color=ACCENT, command=top.destroy)\
@@ -838,78 +1313,97 @@ class VirtualKeyboardApp(ctk.CTk):
 
         except Exception:
             # fallback simples (sem alinhamento)
-            msg = header + self._build_notations_from_csv_pretty(two_cols=False)
+            msg = header + self._notations_text(two_cols=False)
             messagebox.showinfo("Dicas", msg)
 
 
     # ---------- Exportar PNG ----------
+    @traced("export.submit")
     def export_images(self):
+        """F4: enfileira a exportação (thread própria); a UI segue livre e mostra o progresso."""
     # nada para salvar?
-        if not self.selected_images_lines or all(len(line) == 0 for line in self.selected_images_lines):
-            messagebox.showinfo("Error", "Cannot save an empty notation.")
+        if self.notation.is_empty():
+            self._toast("Nada para salvar: a notação está vazia.")
             return
 
-        # --- monta a imagem combinada ---
-        width_per_image = 80
-        height_per_image = 80
-        max_line_length = max(len(line) for line in self.selected_images_lines)
-        line_count = len(self.selected_images_lines)
-        total_width = max_line_length * width_per_image
-        total_height = line_count * height_per_image
-
-        from PIL import Image as PILImage
-        combined = PILImage.new('RGBA', (total_width, total_height), (0, 0, 0, 0))
-        for r, line in enumerate(self.selected_images_lines):
-            x = 0
-            for p in line:
-                img = PILImage.open(p).resize((width_per_image, height_per_image), PILImage.LANCZOS)
-                combined.paste(img, (x, r * height_per_image), mask=img.convert('RGBA').split()[3])
-                x += width_per_image
-
-        # --- pasta de destino ---
-        # = os.path.join(BASE_DIR, "Saved Notations")
-        #os.makedirs(save_dir, exist_ok=True)
-        save_dir = SAVE_DIR
-        os.makedirs(save_dir, exist_ok=True)
-        # --- nome base a partir do personagem ---
-        sel = (self.character_var.get() or "").strip()
-        if sel and sel.lower() != "none":
-            import re
-            base = re.sub(r'[^a-z0-9]+', '_', sel.lower()).strip('_') or "notation"
+        from notation_renderer import output_base_name
+        # nome base a partir do personagem; o worker acha o caminho livre (base.png, base_1.png, ...)
+        # e grava em Saved Notations/. As linhas vão como cópia imutável.
+        self.export_worker.submit(
+            self.renderer.resolve(self.notation.lines()), SAVE_DIR,
+            output_base_name(self.character_var.get()),
+            get_profile(self.output_profile_var.get()),
+            dark=self.include_dark.get(),
+        )
+        self._update_export_status()
+        if self._export_poll_id is None:
+            self._export_poll_id = self.after(EXPORT_POLL_MS, self._poll_exports)
+
+    @property
+    def export_worker(self):
+        if self._export_worker is None:
+            from export_worker import ExportWorker
+            self._export_worker = ExportWorker(lambda: self.renderer)
+        return self._export_worker
+
+    def cancel_exports(self):
+        self.export_worker.cancel()
+
+    @traced("export.poll")
+    def _poll_exports(self):
+        """Thread do Tk: consome os eventos do worker (toasts/progresso) até a fila esvaziar."""
+        worker = self.export_worker
+        while True:
+            try:
+                ev = worker.events.get_nowait()
+            except queue.Empty:
+                break
+            if ev.kind == "done":
+                name = os.path.basename(ev.paths[0])
+                extra = " (+ dark)" if len(ev.paths) > 1 else ""
+                self._toast(f"Salvo: {name}{extra} • {ev.job.profile.name} {ev.nbytes / 1024:.1f} KB, "
+                            f"encode {ev.encode * 1000:.0f} ms")
+            elif ev.kind == "existing":
+                self._toast(f"Já salvo antes: {os.path.basename(ev.paths[0])}")
+            elif ev.kind == "failed":
+                self._toast(f"Falha ao salvar: {ev.error}", TOAST_MS * 2)
+            elif ev.kind == "cancelled":
+                self._toast("Exportação cancelada.")
+        self._update_export_status()
+        if worker.pending or not worker.events.empty():
+            self._export_poll_id = self.after(EXPORT_POLL_MS, self._poll_exports)
+        else:
+            self._export_poll_id = None
+
+    def _update_export_status(self):
+        n = self._export_worker.pending if self._export_worker else 0
+        if n:
+            self.export_status.configure(text=f"Exportando… {n} na fila" if n > 1 else "Exportando…")
+            self.export_status.grid()
+            self.export_cancel.grid()
         else:
-            base = "notation"
-
-        # --- caminho único na pasta: base.png, base_1.png, ...
-        def unique_path(base_name: str) -> str:
-            candidate = os.path.join(save_dir, f"{base_name}.png")
-            if not os.path.exists(candidate):
-                return candidate
-            i = 1
-            while True:
-                candidate = os.path.join(save_dir, f"{base_name}_{i}.png")
-                if not os.path.exists(candidate):
-                    return candidate
-                i += 1
-
-        out = unique_path(base)
-        combined.save(out)
-
-        # --- versão DARK opcional ---
-        if self.include_dark.get():
-            dark = PILImage.new('RGBA', (total_width, total_height), (0, 0, 0, 0))
-            for r, line in enumerate(self.selected_images_lines):
-                x = 0
-                for p in line:
-                    dark_path = p.replace(".png", "_Dark.png")
-                    if os.path.exists(dark_path):
-                        dimg = PILImage.open(dark_path).resize((width_per_image, height_per_image), PILImage.LANCZOS)
-                        dark.paste(dimg, (x, r * height_per_image), mask=dimg.convert('RGBA').split()[3])
-                    x += width_per_image
-            dp = out.replace(".png", "_dark.png")  # ex.: Saved Notations/king_2_dark.png
-            dark.save(dp)
-
-        messagebox.showinfo("Save Successful", f"Saved to:\n{out}")
+            self.export_status.grid_remove()
+            self.export_cancel.grid_remove()
+
+    def _toast(self, text, ms=None):
+        """Aviso não modal no canto inferior direito; some sozinho."""
+        lbl = self._toast_label
+        lbl.configure(text=text)
+        lbl.place(relx=1.0, rely=1.0, x=-20, y=-48, anchor="se")
+        lbl.lift()
+        if self._toast_id is not None:
+            self.after_cancel(self._toast_id)
+        self._toast_id = self.after(ms or TOAST_MS, self._hide_toast)
+
+    def _hide_toast(self):
+        self._toast_id = None
+        self._toast_label.place_forget()
 
 if __name__ == "__main__":
-    app = VirtualKeyboardApp()
+    import multiprocessing
+    multiprocessing.freeze_support()   # executável (PyInstaller): processos do pool do --serve
+    if "--serve" in sys.argv:   # servidor HTTP de renderização, sem abrir a janela
+        from render_server import main as serve_main
+        sys.exit(serve_main([a for a in sys.argv[1:] if a != "--serve" and not a.startswith("--trace")]))
+    app = VirtualKeyboardApp(progressive="--sync-startup" not in sys.argv)
     app.mainloop()
@@ -1,12 +1,21 @@
+  # empacota assets/ e char/ em atlas/ (um PNG + índice por pasta)
+  python .\sprite_atlas.py
+  # pacotes de tema (themes/<pasta>.zip) das pastas de tema presentes
+  New-Item -ItemType Directory -Force .\themes | Out-Null
+  if (Test-Path .\assets_xbox) { python .\theme_packs.py assets_xbox --name Xbox }
+  if (Test-Path .\assets_ps) { python .\theme_packs.py assets_ps --name PlayStation }
+  # compila data/notation_db.json (CSVs validados; o app não lê CSV em runtime)
+  python .\notation_db.py
+
   pyinstaller --clean --noconfirm `
   --name T8Notation `
   --onefile `
   --windowed `
   --icon ".\icon.ico" `
   --add-data ".\icon.ico;." `
-  --add-data ".\assets;assets" `
+  --add-data ".\atlas;atlas" `
+  --add-data ".\themes;themes" `
   --add-data ".\data;data" `
-  --add-data ".\char;char" `
   .\AppNovo5.py
 
   <#
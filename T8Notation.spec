@@ -5,7 +5,7 @@ a = Analysis(
     ['AppNovo5.py'],
     pathex=[],
     binaries=[],
-    datas=[('.\\icon.ico', '.'), ('.\\assets', 'assets'), ('.\\data', 'data'), ('.\\char', 'char')],
+    datas=[('.\\icon.ico', '.'), ('.\\atlas', 'atlas'), ('.\\themes', 'themes'), ('.\\data', 'data')],  # atlas: python sprite_atlas.py; themes: theme_packs.py
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
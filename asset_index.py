@@ -0,0 +1,65 @@
+"""Índice de assets montado uma vez por conjunto (pasta): golpe -> arquivo, _Dark e nome.
+
+Substitui os `os.listdir` + fatiamento de nome de arquivo feitos a cada troca de personagem.
+"""
+import os
+from collections import namedtuple
+
+from resources import resource_path
+from sprite_atlas import list_images, list_dark_pairs
+
+# key: chave do golpe derivada do arquivo ("SEN_Lars" para R9_SEN_Lars.png)
+AssetEntry = namedtuple("AssetEntry", "key filename path dark_path name")
+
+
+def file_move_key(filename):
+    """Chave do golpe no nome do arquivo: R9_SEN_Lars.png -> SEN_Lars (regra do CharMoves.csv)."""
+    return filename[3:][:-4]
+
+
+class AssetIndex:
+    """Entradas de uma pasta de assets + golpes resolvidos por personagem."""
+
+    def __init__(self, folder, move_dict, char_moves):
+        self.folder = folder
+        folder_dir = resource_path(folder)
+        darks = list_dark_pairs(folder)
+
+        # nome para tooltip: coluna Image do CSV; sem linha no CSV, tenta pelo nome do arquivo
+        name_by_image = {(row.get("Image") or "").strip(): row.get("Name") for row in move_dict}
+        name_by_move = {row["Move"].upper(): row["Name"] for row in move_dict}
+
+        def display_name(filename):
+            return (name_by_image.get(filename)
+                    or name_by_move.get(filename[6:][:-4].upper())
+                    or name_by_move.get(file_move_key(filename).upper()))
+
+        self.entries = []            # ordem alfabética de arquivo (= listdir ordenado)
+        self.by_file = {}
+        self.by_key = {}             # chave do arquivo -> [AssetEntry]
+        for filename in list_images(folder):
+            dark = darks.get(filename)
+            entry = AssetEntry(
+                file_move_key(filename), filename,
+                os.path.join(folder_dir, filename),
+                os.path.join(folder_dir, dark) if dark else None,
+                display_name(filename),
+            )
+            self.entries.append(entry)
+            self.by_file[filename] = entry
+            self.by_key.setdefault(entry.key, []).append(entry)
+
+        # personagem -> golpes (em ordem alfabética, como na UI) já resolvidos em entradas
+        self.characters = {}
+        for row in char_moves:
+            moves = row.get("Moves") or ""
+            if not moves or moves == "null":
+                continue
+            resolved = []
+            for move in sorted(moves.split(", ")):
+                resolved.extend(self.by_key.get(move, ()))
+            self.characters[row["Character"]] = resolved
+
+    def character(self, name):
+        """Entradas dos golpes do personagem ([] se não tiver)."""
+        return self.characters.get(name, [])
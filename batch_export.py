@@ -0,0 +1,193 @@
+"""Exportação em lote pela linha de comando (não abre Tk).
+
+Cada linha da entrada:  notação[;nome_de_saída[;personagem]]
+Linhas vazias e começando com '#' são ignoradas.
+
+Exemplos:
+    python batch_export.py combos.txt --dark
+    type combos.txt | python batch_export.py - -j 8 -o "Saved Notations"
+    python batch_export.py combos.txt --profile small      # PNG menor (ver output_profiles.py)
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from resources import SAVE_DIR
+from notation_renderer import NotationRenderer, output_base_name
+from export_index import export_key, get_index
+from output_profiles import PROFILES, DEFAULT_PROFILE, get_profile, save_image
+
+# renderizador e perfil de saída do processo (criados uma vez por worker no initializer)
+_renderer = None
+_profile = None
+
+
+def read_items(stream):
+    """Lê (número_da_linha, notação, nome, personagem) da entrada."""
+    items = []
+    for lineno, raw in enumerate(stream, 1):
+        line = raw.strip()
+        if not line or line.startswith("#"):
+            continue
+        parts = [p.strip() for p in line.split(";")]
+        notation = parts[0]
+        name = parts[1] if len(parts) > 1 and parts[1] else None
+        character = parts[2] if len(parts) > 2 and parts[2] else None
+        items.append((lineno, notation, name, character))
+    return items
+
+
+def dark_output(out):
+    """Arquivo da versão escura: king.png -> king_dark.png."""
+    base, ext = os.path.splitext(out)
+    return f"{base}_dark{ext}"
+
+
+def assign_outputs(items, out_dir, profile, dark=False, assets="assets", dedupe=True):
+    """Define o arquivo de saída de cada item antes de distribuir o trabalho.
+
+    Feito no processo principal para que workers paralelos nunca disputem o mesmo nome.
+    Nomes novos vêm dos contadores do índice da pasta (export_index); com `dedupe`, itens
+    cuja combo já foi exportada apontam para o arquivo existente, e repetições dentro do lote
+    esperam o resultado da primeira cópia (só contam como exportadas se ela der certo).
+    Devolve (jobs, reaproveitados, repetidos, chaves): jobs = (linha, notação, saída);
+    reaproveitados = (linha, caminhos); repetidos = (linha, saída da primeira cópia);
+    chaves = {saída: hash} para registrar no índice.
+    """
+    index = get_index(out_dir)
+    parser = NotationRenderer(assets)
+    jobs, reused, repeated, keys, first = [], [], [], {}, {}
+    for lineno, notation, name, character in items:
+        lines = parser.paths(notation)
+        key = export_key(lines, profile, dark)
+        if dedupe and any(lines):
+            if key in first:
+                repeated.append((lineno, first[key]))
+                continue
+            existing = index.lookup(key)
+            if existing:
+                reused.append((lineno, existing))
+                continue
+        base = os.path.splitext(name)[0] if name and name.lower().endswith((".png", ".webp")) else name
+        out = index.allocate(base or output_base_name(character), profile.ext)
+        first[key] = out
+        keys[out] = key
+        jobs.append((lineno, notation, out))
+    return jobs, reused, repeated, keys
+
+
+def _init_worker(assets, profile, recolor=True):
+    global _renderer, _profile
+    _renderer = NotationRenderer(assets, tile_size=profile.tile_size, recolor_dark=recolor)
+    _profile = profile
+
+
+def _render_job(job, dark):
+    """Renderiza e salva um item; devolve (linha, saída, segundos, bytes, erro)."""
+    lineno, notation, out = job
+    t0 = time.perf_counter()
+    nbytes = 0
+    try:
+        lines = _renderer.paths(notation)
+        if not lines or all(len(line) == 0 for line in lines):
+            raise ValueError("notação vazia (nenhum comando reconhecido)")
+        if dark:   # claro e escuro na mesma passada
+            light, dark_img = _renderer.compose_pair(lines)
+            nbytes += save_image(light, out, _profile).nbytes
+            nbytes += save_image(dark_img, dark_output(out), _profile).nbytes
+        else:
+            nbytes += save_image(_renderer.compose(lines), out, _profile).nbytes
+        return lineno, out, time.perf_counter() - t0, nbytes, None
+    except Exception as e:
+        return lineno, out, time.perf_counter() - t0, nbytes, f"{type(e).__name__}: {e}"
+
+
+def _run_serial(jobs, dark, assets, profile, recolor):
+    _init_worker(assets, profile, recolor)
+    for job in jobs:
+        yield _render_job(job, dark)
+
+
+def _run_pool(jobs, dark, assets, profile, recolor, workers):
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(assets, profile, recolor)) as pool:
+        yield from pool.map(_render_job, jobs, [dark] * len(jobs), chunksize=chunksize)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Exporta notações em lote para PNG (sem GUI).")
+    ap.add_argument("input", nargs="?", default="-",
+                    help="arquivo com uma notação por linha ('-' = stdin)")
+    ap.add_argument("-o", "--out-dir", default=SAVE_DIR, help="pasta de saída")
+    ap.add_argument("--assets", default="assets", help="pasta de assets (tema)")
+    ap.add_argument("--dark", action="store_true", help="gera também a versão _dark")
+    ap.add_argument("--no-recolor", action="store_true",
+                    help="golpes sem arquivo _Dark ficam em branco na versão escura (não deriva do claro)")
+    ap.add_argument("--profile", choices=list(PROFILES), default=DEFAULT_PROFILE,
+                    help="perfil de saída (formato/compressão)")
+    ap.add_argument("--tile-size", type=int, help="tamanho do tile em px (padrão: o do perfil)")
+    ap.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1,
+                    help="processos em paralelo (1 = sem pool)")
+    ap.add_argument("--no-dedupe", action="store_true",
+                    help="renderiza de novo combos já exportadas na pasta (padrão: reaproveita o arquivo)")
+    args = ap.parse_args(argv)
+
+    if args.input == "-":
+        items = read_items(sys.stdin)
+    else:
+        with open(args.input, encoding="utf-8") as f:
+            items = read_items(f)
+    if not items:
+        print("Nenhuma notação na entrada.", file=sys.stderr)
+        return 1
+
+    profile = get_profile(args.profile, args.tile_size)
+    os.makedirs(args.out_dir, exist_ok=True)
+    jobs, reused, repeated, keys = assign_outputs(items, args.out_dir, profile, args.dark, args.assets,
+                                                  dedupe=not args.no_dedupe)
+    for lineno, paths in reused:
+        print(f"igual linha {lineno:<5} {'':>11}  já exportada: {paths[0]}")
+    workers = max(1, min(args.workers, len(jobs)))
+    index = get_index(args.out_dir)
+
+    t0 = time.perf_counter()
+    if workers == 1:
+        results = _run_serial(jobs, args.dark, args.assets, profile, not args.no_recolor)
+    else:
+        results = _run_pool(jobs, args.dark, args.assets, profile, not args.no_recolor, workers)
+
+    failed = total_bytes = 0
+    errors = {}    # saída -> erro (repetições da mesma combo herdam o resultado)
+    for lineno, out, elapsed, nbytes, error in results:
+        total_bytes += nbytes
+        if error:
+            failed += 1
+            errors[out] = error
+            index.release(out)     # o nome não fica gasto
+            print(f"FAIL  linha {lineno:<5} {elapsed * 1000:8.1f} ms  {error}", file=sys.stderr)
+        else:
+            index.record(keys[out], [out, dark_output(out)] if args.dark else [out])
+            print(f"ok    linha {lineno:<5} {elapsed * 1000:8.1f} ms  {nbytes / 1024:7.1f} KB  {out}")
+    for lineno, out in repeated:
+        if out in errors:
+            failed += 1
+            print(f"FAIL  linha {lineno:<5} {'':>11}  repetida (primeira cópia falhou): {errors[out]}",
+                  file=sys.stderr)
+        else:
+            print(f"igual linha {lineno:<5} {'':>11}  repetida no lote: {out}")
+    index.save()
+    total = time.perf_counter() - t0
+
+    done = len(jobs) + len(repeated) - failed
+    print(f"{done}/{len(jobs) + len(repeated)} exportadas em {total:.2f} s "
+          f"({len(jobs) / max(total, 1e-9):.1f} itens/s, {workers} worker(s), perfil {profile.name}, "
+          f"{total_bytes / 1024:.1f} KB); falhas: {failed}; já existentes: {len(reused)}",
+          file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
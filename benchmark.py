@@ -0,0 +1,451 @@
+"""Benchmarks de parsing, renderização, palette e exportação (headless).
+
+    python benchmark.py                          # roda tudo e imprime a tabela
+    python benchmark.py --json bench.json        # resultados em JSON
+    python benchmark.py --baseline bench.json    # compara com um baseline salvo (exit 1 se regrediu)
+    python benchmark.py --only parse,render      # só alguns grupos
+    python benchmark.py --leak-check 500         # centenas de trocas de personagem/tema (exit 1 se vazou)
+
+Os grupos "ui" (palette, troca de personagem/tema, parse+preview) precisam de Tk: sem
+DISPLAY, o script sobe um Xvfb se houver um instalado; senão esses casos são pulados.
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import math
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RESULTS_VERSION = 1
+DEFAULT_TOLERANCE = 0.25      # +25% na mediana = regressão
+LEAK_SWITCHES = 300           # trocas de personagem/tema no --leak-check
+LEAK_OBJECT_SLACK = 0.01      # objetos Python: +1% entre as duas medições é tolerado
+GROUPS = ("parse", "render", "palette", "export", "ui")
+
+# combos de referência (~5, ~50 e 500 tokens)
+SHORT_COMBO = "df2 fh > sen3"
+MEDIUM_COMBO = ("f n d df 2 > f f 2 fh > sen 3 > df 1 fh > sen 12 > hw 3 4, "
+                "ws2 > b1+2 > f f 2 > hw 1 2, d 1 2 > sen 3 > df 1 > hw 3 4 > ff 2 > t!")
+_LONG_PARTS = "df2 fh > sen3 > df1 fh > sen12 > hw3 4 > ws2 > b1+2 > ff2 > d12".split()
+# linhas todas diferentes (rotação), para o cache por linha do parser não mascarar o custo
+LONG_COMBO = ", ".join(" ".join(_LONG_PARTS[i % 9:] + _LONG_PARTS[:i % 9] + [str(i % 4 + 1)])
+                       for i in range(16))
+
+
+# ---------- Medição ----------
+def measure(fn, repeat=20, warmup=2, setup=None):
+    """Executa `fn` `repeat` vezes (depois de `warmup`); `setup` roda antes de cada execução, fora do tempo."""
+    for _ in range(warmup):
+        if setup:
+            setup()
+        fn()
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return {
+        "median_ms": round(statistics.median(samples), 4),
+        "min_ms": round(min(samples), 4),
+        "runs": repeat,
+    }
+
+
+# ---------- Casos headless ----------
+def bench_parse(results, repeat):
+    from notation_renderer import NotationRenderer
+    from notation_tokenizer import IncrementalParser
+
+    renderer = NotationRenderer()
+    tokenizer = renderer.tokenizer
+    for label, combo in (("short", SHORT_COMBO), ("medium", MEDIUM_COMBO), ("500", LONG_COMBO)):
+        ntok = sum(len(line) for line in renderer.parse(combo).lines)
+        results[f"parse.tokenize.{label}"] = dict(
+            measure(lambda c=combo: [tokenizer.tokenize(s) for s in c.split(",")], repeat), tokens=ntok)
+        results[f"parse.full.{label}"] = measure(
+            lambda c=combo: IncrementalParser(tokenizer).parse(c), repeat)
+
+    # digitação: um caractere a mais numa combo longa (parser incremental aquecido)
+    parser = IncrementalParser(tokenizer)
+    parser.parse(LONG_COMBO)
+    state = {"i": 0}
+
+    def keystroke():
+        state["i"] += 1
+        parser.parse(LONG_COMBO + " " + "1" * (state["i"] % 2 + 1))
+    results["parse.incremental.keystroke"] = measure(keystroke, repeat)
+
+
+def bench_render(results, repeat):
+    from notation_renderer import NotationRenderer
+    from output_profiles import PROFILES, encode_image
+
+    renderer = NotationRenderer()
+    for label, combo in (("short", SHORT_COMBO), ("medium", MEDIUM_COMBO)):
+        lines = renderer.paths(combo)
+        for dark in (False, True):
+            variant = "dark" if dark else "light"
+            results[f"render.compose.{label}.{variant}.cold"] = measure(
+                lambda: renderer.compose(lines, dark=dark), repeat, setup=renderer.clear_cache)
+            results[f"render.compose.{label}.{variant}.warm"] = measure(
+                lambda: renderer.compose(lines, dark=dark), repeat)
+            img = renderer.compose(lines, dark=dark)
+            if dark:
+                results[f"render.compose_pair.{label}.cold"] = measure(
+                    lambda: renderer.compose_pair(lines), repeat, setup=renderer.clear_cache)
+                results[f"render.compose_pair.{label}.warm"] = measure(
+                    lambda: renderer.compose_pair(lines), repeat)
+            results[f"render.png_encode.{label}.{variant}"] = measure(
+                lambda: img.save(io.BytesIO(), format="PNG"), repeat)
+            for name, profile in PROFILES.items():
+                results[f"render.encode.{name}.{label}.{variant}"] = dict(
+                    measure(lambda p=profile: encode_image(img, p), repeat),
+                    bytes=encode_image(img, profile).nbytes)
+
+
+def bench_palette(results, repeat):
+    from asset_index import AssetIndex
+    from notation_renderer import NotationRenderer
+    from AppNovo5 import palette_layout_rows
+    from notation_db import load_database
+    from sprite_atlas import release_atlas
+
+    db = load_database()
+    move_dict, char_moves = db.move_rows(), db.char_rows()
+    results["palette.index"] = measure(lambda: AssetIndex("assets", move_dict, char_moves), repeat)
+    index = AssetIndex("assets", move_dict, char_moves)
+    results["palette.layout_rows"] = measure(lambda: palette_layout_rows(index), repeat)
+
+    renderer = NotationRenderer(move_dict=move_dict)
+    paths = [renderer.path(icon.move_id) for row in palette_layout_rows(index) for icon in row]
+
+    def decode_all():
+        for p in paths:
+            renderer.tile(p, 32)
+
+    def cold():
+        # frio de verdade: sem tiles/imagens no renderizador e sem folhas do atlas decodificadas
+        renderer.clear_cache()
+        release_atlas("assets")
+    results["palette.decode.cold"] = dict(measure(decode_all, repeat, setup=cold), icons=len(paths))
+    results["palette.decode.warm"] = measure(decode_all, repeat)
+
+    names = [row["Character"] for row in char_moves]
+    state = {"i": 0}
+
+    def character_lookup():
+        state["i"] += 1
+        for entry in index.character(names[state["i"] % len(names)]):
+            renderer.tile(entry.path, 32)
+    results["palette.character_lookup"] = measure(character_lookup, repeat)
+
+
+def bench_export(results, repeat):
+    from export_index import ExportIndex
+    from notation_renderer import NotationRenderer
+
+    renderer = NotationRenderer()
+    lines = renderer.paths(MEDIUM_COMBO)
+    with tempfile.TemporaryDirectory() as out_dir:
+        index = ExportIndex(out_dir)    # mesmo alocador de nomes das exportações reais
+
+        def export(dark):
+            out = index.allocate("bench")
+            if dark:
+                light, dark_img = renderer.compose_pair(lines)
+                light.save(out)
+                dark_img.save(out.replace(".png", "_dark.png"))
+            else:
+                renderer.compose(lines).save(out)
+        results["export.medium.light"] = measure(lambda: export(False), repeat)
+        results["export.medium.light+dark"] = measure(lambda: export(True), repeat)
+
+
+# ---------- Casos com Tk ----------
+def _ensure_display():
+    """Garante um DISPLAY (sobe Xvfb se preciso). Devolve (ok, processo_xvfb|None)."""
+    if os.environ.get("DISPLAY") or sys.platform == "win32":
+        return True, None
+    xvfb = shutil.which("Xvfb")
+    if not xvfb:
+        return False, None
+    display = ":97"
+    proc = subprocess.Popen([xvfb, display, "-screen", "0", "1600x1000x24", "-nolisten", "tcp"],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    time.sleep(0.5)
+    os.environ["DISPLAY"] = display
+    return proc.poll() is None, proc
+
+
+def bench_ui(results, repeat):
+    from AppNovo5 import VirtualKeyboardApp
+    from sprite_atlas import release_atlas
+
+    t0 = time.perf_counter()
+    app = VirtualKeyboardApp(progressive=False)
+    app.update()
+    startup = round((time.perf_counter() - t0) * 1000, 4)
+    results["ui.startup_sync"] = {"median_ms": startup, "min_ms": startup, "runs": 1}
+    try:
+        def cold():
+            app._asset_indexes.clear()
+            app.renderer.clear_cache()
+            app._img_cache.clear()
+            release_atlas(app.selected_assets)
+
+        def palette_build():
+            app._load_and_group_images()
+            app.update_idletasks()
+        results["ui.palette_build.cold"] = measure(palette_build, repeat, setup=cold)
+        results["ui.palette_build.warm"] = measure(palette_build, repeat)
+
+        characters = [c for c in app.all_characters if c != "None"]
+        state = {"i": 0}
+
+        def character_switch():
+            state["i"] += 1
+            app.character_var.set(characters[state["i"] % len(characters)])
+            app.update_idletasks()
+        results["ui.character_switch"] = measure(character_switch, repeat)
+
+        themes = [label for label, _ in app.theme_options]
+
+        def theme_switch():
+            state["i"] += 1
+            app.images_folder_var.set(themes[state["i"] % len(themes)])
+            app.update_idletasks()
+        results["ui.theme_switch"] = measure(theme_switch, repeat)
+        app.images_folder_var.set(themes[0])
+
+        def type_combo():
+            state["i"] += 1
+            app.string_input.delete(0, "end")
+            app.string_input.insert(0, MEDIUM_COMBO + " 1" * (state["i"] % 2))
+            app._parse_and_update()
+            app.update_idletasks()
+        results["ui.parse_and_preview"] = measure(type_combo, repeat)
+    finally:
+        app.destroy()
+
+
+# ---------- Vazamentos (trocas de personagem/tema) ----------
+def _tk_windows(widget):
+    """Janelas Tk vivas abaixo de `widget` (pelo Tk, não pelos objetos Python)."""
+    tk_ = widget.tk
+    todo, count = [str(widget)], 0
+    while todo:
+        children = tk_.splitlist(tk_.call("winfo", "children", todo.pop()))
+        count += len(children)
+        todo.extend(children)
+    return count
+
+
+def leak_snapshot(app):
+    gc.collect()
+    return {
+        "tk_windows": _tk_windows(app),
+        "tk_images": len(app.tk.splitlist(app.tk.call("image", "names"))),
+        "tk_after": len(app.tk.splitlist(app.tk.call("after", "info"))),
+        "canvas_items": (len(app.palette_scroll.canvas.find_all())
+                         + len(app.preview_canvas.find_all())),
+        "tooltips": app.tooltips.count(),
+        "py_objects": len(gc.get_objects()),
+    }
+
+
+@contextlib.contextmanager
+def _second_theme():
+    """Garante dois temas instalados: sem pacote de outro tema, gera um temporário (cópia do
+    tema padrão) na primeira pasta livre do catálogo e apaga o pacote na saída."""
+    from AppNovo5 import THEME_CATALOG
+    from resources import resource_path
+    from sprite_atlas import release_atlas
+    from theme_packs import BASE_THEME, build_pack, installed_themes
+
+    installed = {folder for _, folder in installed_themes(THEME_CATALOG)}
+    if len(installed) >= 2:
+        yield None
+        return
+    folder = next(folder for _, folder in THEME_CATALOG if folder not in installed)
+    src = resource_path(folder)
+    shutil.copytree(resource_path(BASE_THEME), src)
+    try:
+        path, _ = build_pack(folder)
+    finally:
+        shutil.rmtree(src)
+    try:
+        yield folder
+    finally:
+        release_atlas(folder)
+        os.remove(path)
+
+
+def leak_check(switches=LEAK_SWITCHES):
+    """Faz `switches` trocas de personagem (e de tema a cada volta nos personagens) e compara
+    contagens de widgets/imagens/itens/objetos antes e depois. Devolve (linhas, vazamentos).
+
+    Um ciclo completo roda antes da primeira medição (caches cheios) e o número de trocas é
+    arredondado para ciclos inteiros: as duas medições são no mesmo personagem/tema.
+    """
+    from AppNovo5 import VirtualKeyboardApp
+
+    app = VirtualKeyboardApp(progressive=False)
+    app.update()
+    try:
+        characters = [c for c in app.all_characters if c != "None"]
+        themes = [label for label, _ in app.theme_options]
+        if len(themes) < 2:
+            raise RuntimeError("leak-check precisa de pelo menos dois temas instalados")
+        app.string_input.insert(0, MEDIUM_COMBO)      # preview com conteúdo (re-skin na troca de tema)
+        app._parse_and_update()
+        cycle = len(characters) * len(themes)
+
+        def run(n):
+            for i in range(n):
+                app.character_var.set(characters[i % len(characters)])
+                app.images_folder_var.set(themes[(i // len(characters)) % len(themes)])
+                app.update_idletasks()
+            app.update()
+
+        run(cycle)
+        before = leak_snapshot(app)
+        cycles = max(1, math.ceil(switches / cycle))
+        run(cycles * cycle)
+        after = leak_snapshot(app)
+    finally:
+        app.destroy()
+
+    rows, leaks = [], []
+    for name, b in before.items():
+        a = after[name]
+        limit = b * (1 + LEAK_OBJECT_SLACK) if name == "py_objects" else b
+        flag = ""
+        if a > limit:
+            flag = "  VAZAMENTO"
+            leaks.append(name)
+        rows.append(f"  {name:<14} {b:>9} -> {a:<9} ({a - b:+d}){flag}")
+    rows.append(f"  {cycles * cycle} trocas ({len(characters)} personagens x {len(themes)} tema(s))")
+    return rows, leaks
+
+
+BENCHES = {
+    "parse": bench_parse,
+    "render": bench_render,
+    "palette": bench_palette,
+    "export": bench_export,
+    "ui": bench_ui,
+}
+
+
+# ---------- Baseline ----------
+def compare(results, baseline, tolerance):
+    """Linhas de comparação com o baseline; devolve (linhas, regressões)."""
+    rows, regressions = [], []
+    for name, res in sorted(results.items()):
+        base = baseline.get(name)
+        if not base or not base.get("median_ms"):
+            rows.append(f"  {name:<42} {res['median_ms']:>10.3f} ms   (novo)")
+            continue
+        ratio = res["median_ms"] / base["median_ms"]
+        flag = ""
+        if ratio > 1 + tolerance:
+            flag = "  REGRESSÃO"
+            regressions.append(name)
+        rows.append(f"  {name:<42} {res['median_ms']:>10.3f} ms   x{ratio:5.2f} "
+                    f"(base {base['median_ms']:.3f}){flag}")
+    return rows, regressions
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmarks headless do gerador de notações.")
+    ap.add_argument("--only", help=f"grupos separados por vírgula ({', '.join(GROUPS)})")
+    ap.add_argument("-n", "--repeat", type=int, default=20, help="execuções medidas por caso")
+    ap.add_argument("--json", metavar="ARQ", help="salva os resultados em JSON")
+    ap.add_argument("--baseline", metavar="ARQ", help="JSON de uma execução anterior para comparar")
+    ap.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                    help="aumento relativo da mediana aceito antes de acusar regressão")
+    ap.add_argument("--leak-check", type=int, nargs="?", const=LEAK_SWITCHES, metavar="N",
+                    help=f"só verifica vazamentos em N trocas de personagem/tema (padrão {LEAK_SWITCHES})")
+    args = ap.parse_args(argv)
+
+    if args.leak_check is not None:
+        ok, xvfb = _ensure_display()
+        if not ok:
+            print("leak-check precisa de DISPLAY (ou Xvfb).", file=sys.stderr)
+            return 2
+        try:
+            with _second_theme() as temp:
+                if temp:
+                    print(f"tema temporário para o leak-check: {temp}", file=sys.stderr)
+                rows, leaks = leak_check(args.leak_check)
+        finally:
+            if xvfb is not None:
+                xvfb.terminate()
+        print("\n".join(rows))
+        if leaks:
+            print(f"contagens cresceram: {', '.join(leaks)}", file=sys.stderr)
+        return 1 if leaks else 0
+
+    groups = args.only.split(",") if args.only else list(GROUPS)
+    unknown = [g for g in groups if g not in BENCHES]
+    if unknown:
+        ap.error(f"grupo desconhecido: {', '.join(unknown)}")
+
+    results, skipped, xvfb = {}, [], None
+    try:
+        for group in groups:
+            if group == "ui":
+                ok, xvfb = _ensure_display()
+                if not ok:
+                    skipped.append("ui (sem DISPLAY e sem Xvfb)")
+                    continue
+            t0 = time.perf_counter()
+            BENCHES[group](results, args.repeat)
+            print(f"[{group}] {time.perf_counter() - t0:.1f} s", file=sys.stderr)
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+
+    report = {
+        "version": RESULTS_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "skipped": skipped,
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1, sort_keys=True)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("version") != RESULTS_VERSION:
+            print("Baseline em formato diferente; ignorando.", file=sys.stderr)
+            baseline = {"results": {}}
+        rows, regressions = compare(results, baseline["results"], args.tolerance)
+        print("\n".join(rows))
+    else:
+        for name, res in sorted(results.items()):
+            print(f"  {name:<42} {res['median_ms']:>10.3f} ms   (min {res['min_ms']:.3f})")
+    for s in skipped:
+        print(f"pulado: {s}", file=sys.stderr)
+    if regressions:
+        print(f"{len(regressions)} regressão(ões) acima de {args.tolerance:.0%}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+"""Folha de contato: um documento inteiro de notações (guia de combos) numa imagem grande, ou
+em páginas, gravada faixa a faixa (não abre Tk).
+
+    python contact_sheet.py guia_king.txt --captions --name king_guia
+    python contact_sheet.py guia.txt --dark --wrap 20 --max-height 12000 -o "Saved Notations"
+
+Entrada: o mesmo formato do batch_export (notação[;legenda]); cada linha é uma rota. Com
+--captions, rotas sem legenda ganham os nomes dos golpes (coluna Name do banco).
+
+Memória: o layout é só geometria (faixas com y/altura). Os pixels saem em faixas de
+STRIP_HEIGHT linhas direto para um PNG escrito em streaming (IDAT com zlib incremental), então
+o pico é uma faixa por variante (claro/escuro) + o cache de tiles, qualquer que seja a altura
+da folha. Folhas mais altas que --max-height viram páginas (quebra entre rotas; uma rota maior
+que a página quebra entre linhas de tiles).
+"""
+import argparse
+import os
+import struct
+import sys
+import time
+import zlib
+from collections import namedtuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+from resources import SAVE_DIR
+from batch_export import dark_output, read_items
+from export_index import get_index
+from notation_db import load_database
+from notation_renderer import NotationRenderer, TILE_SIZE
+
+STRIP_HEIGHT = 256        # linhas de pixels por faixa (memória de pico ~ largura * 256 * 4 bytes)
+MAX_HEIGHT = 16384        # altura máxima de uma página (px); acima disso, nova página
+WRAP = 24                 # tiles por linha da folha (linhas maiores quebram)
+MARGIN = 16               # borda da folha (px)
+ROUTE_GAP = 24            # espaço entre rotas (px)
+CAPTION_COLORS = {False: (230, 230, 255, 255), True: (26, 16, 56, 255)}   # claro / escuro (TEXT / BG)
+CAPTION_MAX_LINES = 3     # legendas longas quebram em até 3 linhas; o resto vira "…"
+ELLIPSIS = "…"
+
+# kind: "caption" (payload = linhas de texto) | "tiles" (payload = caminhos da linha de tiles)
+Band = namedtuple("Band", "y height kind payload")
+Page = namedtuple("Page", "height bands")
+
+
+class PngStripWriter:
+    """PNG RGBA 8 bits gravado em faixas: cada faixa vira um IDAT (zlib incremental)."""
+
+    SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+    def __init__(self, path, width, height, level=6):
+        self.path, self.width, self.height = path, width, height
+        self.rows = 0
+        self._z = zlib.compressobj(level)
+        self._f = open(path, "wb")
+        self._f.write(self.SIGNATURE)
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+
+    def _chunk(self, kind, data):
+        self._f.write(struct.pack(">I", len(data)) + kind + data)
+        self._f.write(struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF))
+
+    def write(self, strip):
+        """Acrescenta as linhas de uma faixa RGBA (largura = a da imagem)."""
+        raw, stride = strip.tobytes(), self.width * 4
+        # filtro 0 (None) em cada linha de pixels
+        data = b"".join(b"\x00" + raw[i:i + stride] for i in range(0, len(raw), stride))
+        out = self._z.compress(data)
+        if out:
+            self._chunk(b"IDAT", out)
+        self.rows += strip.height
+
+    def close(self):
+        if self._f.closed:
+            return
+        self._chunk(b"IDAT", self._z.flush())
+        self._chunk(b"IEND", b"")
+        self._f.close()
+        if self.rows != self.height:
+            raise ValueError(f"{self.path}: {self.rows} linhas escritas, esperado {self.height}")
+
+    def abort(self):
+        """Fecha e apaga o arquivo incompleto."""
+        self._f.close()
+        os.remove(self.path)
+
+
+def caption_font(size):
+    for name in ("segoeui.ttf", "DejaVuSans.ttf", "Arial.ttf"):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            pass
+    return ImageFont.load_default(size)
+
+
+def move_names():
+    """Imagem -> nome do golpe (coluna Name), para as legendas automáticas."""
+    names = {}
+    for m in load_database().moves:
+        if m.image and m.name:
+            names.setdefault(m.image, m.name)
+    return names
+
+
+def auto_caption(lines, names):
+    """Legenda a partir dos golpes da rota: "Heaven's Wrath · Balcony Break" (sem repetir seguidos)."""
+    out = []
+    for line in lines:
+        for path in line:
+            name = names.get(os.path.basename(path))
+            if name and (not out or out[-1] != name):
+                out.append(name)
+    return " · ".join(out)
+
+
+def _ellipsize(text, font, max_width):
+    """Corta `text` com "…" para caber em `max_width` px."""
+    if font.getlength(text) <= max_width:
+        return text
+    while text and font.getlength(text + ELLIPSIS) > max_width:
+        text = text[:-1]
+    return text.rstrip(" ·") + ELLIPSIS
+
+
+def wrap_caption(text, font, max_width, max_lines=CAPTION_MAX_LINES):
+    """Quebra a legenda por palavras em linhas de até `max_width` px (a última leva "…" se sobrar)."""
+    lines, current = [], ""
+    words = text.split()
+    for i, word in enumerate(words):
+        candidate = f"{current} {word}" if current else word
+        if font.getlength(candidate) <= max_width:
+            current = candidate
+            continue
+        if current:
+            lines.append(current)
+        current = word
+        if len(lines) == max_lines - 1:
+            current = " ".join(words[i:])
+            break
+    lines.append(current)
+    return [_ellipsize(line, font, max_width) for line in lines]
+
+
+def sheet_width(routes, tile=TILE_SIZE, wrap=WRAP):
+    widest = max((len(line) for _, lines in routes for line in lines), default=1)
+    return 2 * MARGIN + min(wrap, max(1, widest)) * tile
+
+
+def layout_sheet(routes, tile=TILE_SIZE, wrap=WRAP, caption_height=0, max_height=MAX_HEIGHT,
+                 fit_caption=None):
+    """Rotas [(legenda|None, linhas de caminhos)] -> (largura, [Page]). Só geometria, sem pixels.
+
+    `caption_height` é a altura de uma linha de legenda; `fit_caption(texto, largura)` quebra a
+    legenda em linhas que caibam na folha (sem ele, uma linha só).
+    """
+    width = sheet_width(routes, tile, wrap)
+
+    # cada rota vira um bloco de faixas com y relativo ao topo do bloco
+    blocks = []
+    for caption, lines in routes:
+        bands, y = [], 0
+        if caption and caption_height:
+            text = tuple(fit_caption(caption, width - 2 * MARGIN)) if fit_caption else (caption,)
+            bands.append(Band(y, caption_height * len(text), "caption", text))
+            y += caption_height * len(text)
+        for line in lines:
+            for start in range(0, len(line), wrap):
+                bands.append(Band(y, tile, "tiles", tuple(line[start:start + wrap])))
+                y += tile
+        if bands:
+            blocks.append((y, bands))
+
+    pages, bands, y = [], [], MARGIN
+    limit = max_height - MARGIN
+
+    def new_page():
+        nonlocal bands, y
+        if bands:
+            pages.append(Page(y - ROUTE_GAP + MARGIN, bands))
+        bands, y = [], MARGIN
+
+    for height, block in blocks:
+        if bands and y + height > limit:
+            new_page()
+        for band in block:
+            # rota maior que a página: quebra entre as faixas dela
+            if bands and y + band.height > limit:
+                y += ROUTE_GAP
+                new_page()
+            bands.append(band._replace(y=y))
+            y += band.height
+        y += ROUTE_GAP
+    new_page()
+    return width, pages
+
+
+def render_page(renderer, page, width, writers, font=None, strip_height=STRIP_HEIGHT):
+    """Desenha a página faixa a faixa em `writers` ({dark: PngStripWriter})."""
+    tile = renderer.tile_size
+    bands = page.bands
+    first = 0
+    for top in range(0, page.height, strip_height):
+        h = min(strip_height, page.height - top)
+        while first < len(bands) and bands[first].y + bands[first].height <= top:
+            first += 1
+        for dark, writer in writers.items():
+            strip = Image.new("RGBA", (width, h), (0, 0, 0, 0))
+            draw = None
+            get_tile = renderer.dark_tile if dark else renderer.tile
+            for band in bands[first:]:
+                if band.y >= top + h:
+                    break
+                if band.kind == "caption":
+                    draw = draw or ImageDraw.Draw(strip)
+                    line_height = band.height // len(band.payload)
+                    for i, text in enumerate(band.payload):
+                        draw.text((MARGIN, band.y - top + i * line_height), text,
+                                  fill=CAPTION_COLORS[dark], font=font)
+                    continue
+                for k, path in enumerate(band.payload):
+                    t = get_tile(path, tile)
+                    if t is not None:   # paste recorta o que sai da faixa
+                        strip.paste(t[0], (MARGIN + k * tile, band.y - top), mask=t[1])
+            writer.write(strip)
+
+
+def export_sheet(items, out_dir, base="sheet", assets="assets", tile=TILE_SIZE, wrap=WRAP,
+                 captions=False, dark=False, max_height=MAX_HEIGHT, level=6):
+    """Itens do read_items -> arquivos gravados [(página, caminhos)] e avisos."""
+    renderer = NotationRenderer(assets, tile_size=tile)
+    names = move_names() if captions else {}
+    routes, warnings = [], []
+    for lineno, notation, caption, _ in items:
+        lines = [line for line in renderer.paths(notation) if line]
+        if not lines:
+            warnings.append(f"linha {lineno}: nenhum comando reconhecido")
+            continue
+        if captions and not caption:
+            caption = auto_caption(lines, names)
+        routes.append((caption, lines))
+
+    font_size = max(12, tile // 4)
+    caption_height = font_size + 10 if captions or any(c for c, _ in routes) else 0
+    font = caption_font(font_size) if caption_height else None
+    fit = (lambda text, max_width: wrap_caption(text, font, max_width)) if font else None
+    width, pages = layout_sheet(routes, tile, wrap, caption_height, max_height, fit)
+
+    index = get_index(out_dir)
+    os.makedirs(out_dir, exist_ok=True)
+    written = []
+    try:
+        for n, page in enumerate(pages, 1):
+            out = index.allocate(base if len(pages) == 1 else f"{base}_p{n}", ".png")
+            paths = {False: out}
+            if dark:
+                paths[True] = dark_output(out)
+            writers = {}
+            try:
+                for d, p in paths.items():
+                    writers[d] = PngStripWriter(p, width, page.height, level)
+                render_page(renderer, page, width, writers, font)
+                for w in writers.values():
+                    w.close()
+            except BaseException:
+                for w in writers.values():
+                    w.abort()
+                index.release(out)   # o nome desta página não fica gasto
+                raise
+            written.append((n, list(paths.values())))
+    finally:
+        index.save()
+    return written, warnings
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Exporta um documento de notações como folha(s) de contato PNG.")
+    ap.add_argument("input", nargs="?", default="-",
+                    help="arquivo com uma rota por linha: notação[;legenda] ('-' = stdin)")
+    ap.add_argument("-o", "--out-dir", default=SAVE_DIR, help="pasta de saída")
+    ap.add_argument("--name", default="sheet", help="nome base do arquivo (páginas: _p1, _p2, ...)")
+    ap.add_argument("--assets", default="assets", help="pasta de assets (tema)")
+    ap.add_argument("--tile-size", type=int, default=TILE_SIZE, help="tamanho do tile em px")
+    ap.add_argument("--wrap", type=int, default=WRAP, help="tiles por linha da folha")
+    ap.add_argument("--captions", action="store_true",
+                    help="legenda em cada rota (sem legenda na entrada: nomes dos golpes)")
+    ap.add_argument("--dark", action="store_true", help="gera também a folha _dark (mesma passada)")
+    ap.add_argument("--max-height", type=int, default=MAX_HEIGHT, help="altura máxima de cada página (px)")
+    ap.add_argument("--level", type=int, default=6, choices=range(10), metavar="0-9",
+                    help="compressão zlib do PNG")
+    args = ap.parse_args(argv)
+
+    if args.input == "-":
+        items = read_items(sys.stdin)
+    else:
+        with open(args.input, encoding="utf-8") as f:
+            items = read_items(f)
+    if not items:
+        print("Nenhuma notação na entrada.", file=sys.stderr)
+        return 1
+
+    t0 = time.perf_counter()
+    written, warnings = export_sheet(items, args.out_dir, args.name, args.assets, args.tile_size,
+                                     args.wrap, args.captions, args.dark, args.max_height, args.level)
+    for warning in warnings:
+        print("  !", warning, file=sys.stderr)
+    for n, paths in written:
+        for path in paths:
+            with Image.open(path) as img:
+                size = img.size
+            print(f"página {n}: {path} ({size[0]}x{size[1]}, {os.path.getsize(path) / 1024:.1f} KB)")
+    print(f"{len(items) - len(warnings)} rota(s) em {len(written)} página(s), "
+          f"{time.perf_counter() - t0:.2f} s", file=sys.stderr)
+    return 0 if written else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""Índice da pasta de saída (Saved Notations/.export_index.json).
+
+- contadores por nome base: o próximo nome livre sai sem varrer a pasta
+  (só na primeira vez de cada base os nomes existentes são testados);
+- hash da notação normalizada + tema + perfil/tamanho + variante -> arquivos já gravados:
+  exportar de novo a mesma combo devolve o arquivo existente sem renderizar.
+"""
+import hashlib
+import json
+import os
+import threading
+
+INDEX_FILE = ".export_index.json"
+INDEX_VERSION = 1
+
+
+def normalize_lines(lines):
+    """Linhas de caminhos -> linhas de "pasta/arquivo" (independe de onde o app está instalado)."""
+    return tuple(
+        tuple(os.path.basename(os.path.dirname(p)) + "/" + os.path.basename(p) for p in line)
+        for line in lines
+        if line
+    )
+
+
+def export_key(lines, profile, dark=False):
+    """Hash do conteúdo exportado: imagens por linha (com o tema na pasta), perfil, tile e variante."""
+    payload = json.dumps([normalize_lines(lines), profile.name, profile.tile_size, bool(dark)],
+                         separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class ExportIndex:
+    """Contadores e hashes de uma pasta de saída. Thread-safe dentro do processo."""
+
+    def __init__(self, save_dir):
+        self.save_dir = save_dir
+        self.path = os.path.join(save_dir, INDEX_FILE)
+        self._lock = threading.Lock()
+        self.counters = {}     # "base.ext" -> próximo sufixo a tentar (0 = sem sufixo)
+        self.files = {}        # hash -> [caminhos relativos à pasta]
+        self._allocated = {}   # caminho -> (contador, sufixo) dos nomes dados nesta sessão
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                self.counters = data.get("counters", {})
+                self.files = data.get("files", {})
+        except (OSError, ValueError):
+            pass
+
+    def lookup(self, key):
+        """Caminhos já exportados para a chave, ou None (entradas cujos arquivos sumiram são descartadas)."""
+        with self._lock:
+            names = self.files.get(key)
+            if not names:
+                return None
+            paths = [os.path.join(self.save_dir, n) for n in names]
+            if all(os.path.exists(p) for p in paths):
+                return paths
+            del self.files[key]
+            return None
+
+    def allocate(self, base, ext=".png", reserved=()):
+        """Próximo caminho livre: base.ext, base_1.ext, ... a partir do contador da base."""
+        counter_key = base + ext
+        with self._lock:
+            n = self.counters.get(counter_key, 0)
+            while True:
+                name = f"{base}{ext}" if n == 0 else f"{base}_{n}{ext}"
+                path = os.path.join(self.save_dir, name)
+                n += 1
+                if path not in reserved and not os.path.exists(path):
+                    break
+            self.counters[counter_key] = n
+            self._allocated[path] = (counter_key, n - 1)
+            return path
+
+    def release(self, path):
+        """Devolve o nome de uma exportação que falhou: o contador volta para ele (o allocate
+        pula nomes que existirem, então recuar o contador é seguro)."""
+        with self._lock:
+            slot = self._allocated.pop(path, None)
+            if slot is not None:
+                counter_key, n = slot
+                self.counters[counter_key] = min(self.counters.get(counter_key, 0), n)
+
+    def record(self, key, paths):
+        with self._lock:
+            self.files[key] = [os.path.relpath(p, self.save_dir) for p in paths]
+
+    def save(self):
+        """Grava o índice (troca atômica do arquivo)."""
+        with self._lock:
+            data = {"version": INDEX_VERSION, "counters": self.counters, "files": self.files}
+            os.makedirs(self.save_dir, exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(save_dir):
+    """Índice da pasta (um por pasta no processo)."""
+    key = os.path.abspath(save_dir)
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = ExportIndex(save_dir)
+        return _indexes[key]
@@ -0,0 +1,122 @@
+"""Exportação em segundo plano: fila de jobs processada por uma thread (sem Tk aqui).
+
+O app enfileira um `ExportJob` com uma cópia imutável das linhas e lê os eventos em
+`events` a partir do thread do Tk (polling com `after`).
+"""
+import os
+import queue
+import threading
+import time
+from collections import namedtuple
+
+from export_index import export_key, get_index
+from profiling import traced
+from output_profiles import save_image
+
+# lines: tupla de tuplas de caminhos (snapshot; edições na UI não afetam o job)
+ExportJob = namedtuple("ExportJob", "id lines save_dir base profile dark")
+
+# kind: "started" | "done" | "existing" (mesma combo já exportada) | "failed" | "cancelled"
+# done: paths (arquivos gravados), nbytes, seconds (total), encode (só codificação); failed: error
+ExportEvent = namedtuple("ExportEvent", "kind job paths nbytes seconds encode error")
+
+
+def snapshot_lines(lines):
+    """Cópia imutável das linhas do preview."""
+    return tuple(tuple(line) for line in lines)
+
+
+class ExportWorker:
+    """Uma thread que compõe, codifica e grava os jobs na ordem em que chegam."""
+
+    def __init__(self, renderer):
+        self.renderer = renderer          # objeto ou callable que devolve o renderer
+        self.events = queue.Queue()
+        self._jobs = queue.Queue()
+        self._active = set()              # ids na fila ou em andamento
+        self._cancelled = set()
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self.pending = 0                  # jobs na fila ou em andamento
+        self._thread = threading.Thread(target=self._run, name="export-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, lines, save_dir, base, profile, dark=False):
+        """Enfileira e devolve o job (o id serve para `cancel`)."""
+        with self._lock:
+            job = ExportJob(self._next_id, snapshot_lines(lines), save_dir, base, profile, dark)
+            self._next_id += 1
+            self._active.add(job.id)
+            self.pending += 1
+        self._jobs.put(job)
+        return job
+
+    def cancel(self, job_id=None):
+        """Cancela um job (ou, sem id, todos os pendentes). O job em andamento para no próximo passo."""
+        with self._lock:
+            if job_id is None:
+                self._cancelled.update(self._active)
+            elif job_id in self._active:
+                self._cancelled.add(job_id)
+
+    def _is_cancelled(self, job):
+        with self._lock:
+            return job.id in self._cancelled
+
+    def _finish(self, event):
+        with self._lock:
+            self.pending -= 1
+            self._active.discard(event.job.id)
+            self._cancelled.discard(event.job.id)
+        self.events.put(event)
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            if self._is_cancelled(job):
+                self._finish(ExportEvent("cancelled", job, (), 0, 0.0, 0.0, None))
+                continue
+            self.events.put(ExportEvent("started", job, (), 0, 0.0, 0.0, None))
+            self._finish(self._export(job))
+
+    @traced("export.render")
+    def _export(self, job):
+        t0 = time.perf_counter()
+        renderer = self.renderer() if callable(self.renderer) else self.renderer
+        profile = job.profile
+        try:
+            # mesma notação/tema/perfil/variante já exportada: devolve o arquivo existente
+            index = get_index(job.save_dir)
+            key = export_key(job.lines, profile, job.dark)
+            existing = index.lookup(key)
+            if existing:
+                return ExportEvent("existing", job, tuple(existing), sum(os.path.getsize(p) for p in existing),
+                                   time.perf_counter() - t0, 0.0, None)
+
+            if job.dark:
+                images = renderer.compose_pair(job.lines, tile_size=profile.tile_size)
+            else:
+                images = (renderer.compose(job.lines, tile_size=profile.tile_size),)
+            if self._is_cancelled(job):
+                return ExportEvent("cancelled", job, (), 0, time.perf_counter() - t0, 0.0, None)
+
+            os.makedirs(job.save_dir, exist_ok=True)
+            out = index.allocate(job.base, profile.ext)
+            root, ext = os.path.splitext(out)
+            paths = (out, f"{root}_dark{ext}")[:len(images)]   # ex.: king_2.png, king_2_dark.png
+            try:
+                saved = [save_image(img, path, profile) for img, path in zip(images, paths)]
+            except Exception:
+                index.release(out)   # o nome não fica gasto
+                raise
+            index.record(key, paths)
+            index.save()
+            return ExportEvent("done", job, paths, sum(r.nbytes for r in saved),
+                               time.perf_counter() - t0, sum(r.seconds for r in saved), None)
+        except Exception as e:
+            return ExportEvent("failed", job, (), 0, time.perf_counter() - t0, 0.0, f"{type(e).__name__}: {e}")
+
+    def stop(self):
+        self._jobs.put(None)
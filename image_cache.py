@@ -0,0 +1,110 @@
+"""Cache LRU de imagens com orçamento em bytes e contadores para diagnóstico."""
+import threading
+from collections import OrderedDict
+
+# tamanhos (px lógicos) que a UI realmente pede: palette 24..32, preview 28/32, retrato 48
+SIZE_BUCKETS = (24, 28, 32, 48)
+
+
+def snap_size(size, buckets=SIZE_BUCKETS):
+    """Maior bucket <= size (ou o menor bucket), para não gerar uma imagem por pixel."""
+    best = buckets[0]
+    for b in buckets:
+        if b <= size:
+            best = b
+    return best
+
+
+def image_bytes(img):
+    """Bytes ocupados por uma imagem PIL decodificada (ou PhotoImage: 4 bytes/pixel)."""
+    if img is None:
+        return 0
+    if hasattr(img, "getbands"):
+        w, h = img.size
+        return w * h * len(img.getbands())
+    return img.width() * img.height() * 4
+
+
+class ImageCache:
+    """LRU limitado por bytes. Guarda também "não existe" (None) para evitar novas buscas.
+
+    Thread-safe: o renderizador pode ser usado por vários threads (servidor/exportação).
+    """
+
+    def __init__(self, max_bytes, name="images"):
+        self.name = name
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()     # chave -> (valor, bytes)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.resident_bytes = 0
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key, value, nbytes=None):
+        nbytes = image_bytes(value) if nbytes is None else nbytes
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.resident_bytes -= old[1]
+            self._data[key] = (value, nbytes)
+            self.resident_bytes += nbytes
+            # expulsa os menos usados; o item recém-inserido sempre fica
+            while self.resident_bytes > self.max_bytes and len(self._data) > 1:
+                _, (_, freed) = self._data.popitem(last=False)
+                self.resident_bytes -= freed
+                self.evictions += 1
+        return value
+
+    def get_or_load(self, key, loader):
+        """Valor em cache ou `loader()` (que pode devolver None = não existe)."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return item[0]
+            self.misses += 1
+        return self.put(key, loader())
+
+    def discard(self, predicate):
+        """Remove as entradas cuja chave satisfaz `predicate` (ex.: um tema que saiu de uso)."""
+        with self._lock:
+            keys = [k for k in self._data if predicate(k)]
+            for k in keys:
+                self.resident_bytes -= self._data.pop(k)[1]
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.resident_bytes = 0
+
+    def stats(self):
+        """Contadores: hits, misses, evictions, entradas e bytes residentes."""
+        with self._lock:
+            return {
+                "name": self.name,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._data),
+                "resident_bytes": self.resident_bytes,
+                "max_bytes": self.max_bytes,
+            }
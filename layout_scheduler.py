@@ -0,0 +1,67 @@
+"""Agendador de layout com marcação do que mudou ("sujo"), no máximo um layout por ciclo ocioso.
+
+    scheduler = LayoutScheduler(widget, run)      # run(sujos) -> True se refez o layout
+    scheduler.invalidate("width")                 # largura mudou
+    scheduler.invalidate("rows")                  # composição das linhas mudou
+
+Cada `invalidate` só marca o motivo; o primeiro de um ciclo agenda um `after_idle` e os
+seguintes se juntam a ele (nada de cancelar/rearmar timers). `run` recebe o conjunto de
+motivos e decide se há trabalho: se as entradas do layout não mudaram, devolve False e conta
+como "pulado". Os contadores (pedidos x executados x pulados) vão para o trace (--trace).
+"""
+
+
+class LayoutScheduler:
+    """Junta os pedidos de layout de um ciclo ocioso do Tk numa única chamada de `run`."""
+
+    def __init__(self, widget, run):
+        self.widget = widget
+        self.run = run                 # run(sujos: set) -> bool (False = nada a refazer)
+        self.dirty = set()
+        self._job = None
+        self.requested = 0             # chamadas de invalidate
+        self.performed = 0             # execuções que refizeram o layout
+        self.skipped = 0               # execuções sem mudança nas entradas
+        self.reasons = {}              # motivo -> pedidos
+
+    def invalidate(self, *reasons):
+        """Marca `reasons` como sujos e agenda o layout para o próximo ciclo ocioso."""
+        self.requested += 1
+        for reason in reasons:
+            self.reasons[reason] = self.reasons.get(reason, 0) + 1
+        self.dirty.update(reasons)
+        if self._job is None:
+            self._job = self.widget.after_idle(self._on_idle)
+
+    def _on_idle(self):
+        self._job = None
+        self.flush()
+
+    def flush(self):
+        """Roda o layout agora se houver algo sujo (sem esperar o ciclo ocioso)."""
+        self.cancel_pending()
+        if not self.dirty:
+            return False
+        dirty, self.dirty = self.dirty, set()
+        if self.run(dirty):
+            self.performed += 1
+            return True
+        self.skipped += 1
+        return False
+
+    def defer(self, reasons):
+        """Guarda `reasons` para o próximo layout sem agendar (ex.: widget ainda sem tamanho)."""
+        self.dirty.update(reasons)
+
+    def cancel_pending(self):
+        """Desarma o after_idle (os motivos sujos continuam marcados)."""
+        if self._job is not None:
+            try:
+                self.widget.after_cancel(self._job)
+            except Exception:
+                pass
+            self._job = None
+
+    def stats(self):
+        return {"requested": self.requested, "performed": self.performed, "skipped": self.skipped,
+                **{f"dirty.{reason}": n for reason, n in self.reasons.items()}}
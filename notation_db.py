@@ -0,0 +1,229 @@
+"""Banco de notações compilado: MoveDictModified.csv + CharMoves.csv -> data/notation_db.json.
+
+Build (antes do PyInstaller; também roda sozinho quando os CSVs mudam):
+    python notation_db.py             # recompila se algo mudou e lista os problemas
+    python notation_db.py --strict    # exit 1 se houver problemas (golpe sem imagem, etc.)
+    python notation_db.py --force     # recompila mesmo sem mudanças
+
+O build valida cada golpe contra os conjuntos de assets e cada entrada do CharMoves
+contra os golpes/arquivos. Em runtime o app e as ferramentas só leem o JSON (uma leitura);
+o CSV só é lido de novo quando mtime/tamanho E hash de alguma fonte mudaram.
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import namedtuple
+
+from resources import resource_path
+
+DB_VERSION = 1
+DB_FILE = "notation_db.json"
+MOVES_CSV = "MoveDictModified.csv"
+CHARS_CSV = "CharMoves.csv"
+ASSET_SETS = ("assets", "assets_xbox", "assets_ps")   # temas validados (os que existirem)
+
+Move = namedtuple("Move", "move name image")
+
+
+# ---------- Fontes ----------
+def _source_paths():
+    """{nome lógico: caminho} das fontes do build (CSVs e pastas de assets existentes)."""
+    sources = {MOVES_CSV: resource_path("data", MOVES_CSV), CHARS_CSV: resource_path("data", CHARS_CSV)}
+    for folder in ASSET_SETS:
+        path = resource_path(folder)
+        if os.path.isdir(path):
+            sources[folder + "/"] = path
+    return sources
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _digest(path):
+    """Hash do conteúdo (arquivo) ou da listagem (pasta de assets)."""
+    h = hashlib.sha1()
+    if os.path.isdir(path):
+        h.update("\n".join(sorted(os.listdir(path))).encode("utf-8"))
+    else:
+        with open(path, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+# ---------- Build ----------
+def _read_csv(path):
+    with open(path, mode='r', encoding='utf-8') as file:
+        return list(csv.DictReader(file, delimiter=';'))
+
+
+def compile_database(sources=None):
+    """Lê os CSVs, valida contra os assets e devolve o dict serializável do banco."""
+    from asset_index import file_move_key          # build: lista pastas (atlas/PNG)
+    from sprite_atlas import list_images
+
+    sources = sources or _source_paths()
+    problems = []
+
+    moves, seen = [], {}
+    for lineno, row in enumerate(_read_csv(sources[MOVES_CSV]), 2):
+        move = (row.get("Move") or "").strip()
+        name = (row.get("Name") or "").strip()
+        image = (row.get("Image") or "").strip()
+        if not move:
+            problems.append(f"{MOVES_CSV}:{lineno}: linha sem Move")
+            continue
+        if move.upper() in seen:
+            problems.append(f"{MOVES_CSV}:{lineno}: {move} repetido (linha {seen[move.upper()]})")
+            continue
+        seen[move.upper()] = lineno
+        if not image:
+            problems.append(f"{MOVES_CSV}:{lineno}: {move} sem imagem")
+        elif image != row.get("Image"):
+            problems.append(f"{MOVES_CSV}:{lineno}: {move}: espaços no nome da imagem {row.get('Image')!r}")
+        moves.append([move, name, image])
+
+    # cada imagem precisa existir em todos os temas presentes
+    file_keys, referenced = set(), {m[2] for m in moves if m[2]}
+    for folder in (f for f in ASSET_SETS if f + "/" in sources):
+        files = set(list_images(folder))
+        file_keys.update(file_move_key(f) for f in files)
+        for move, _, image in moves:
+            if image and image not in files:
+                problems.append(f"{move}: {image} não existe em {folder}/")
+        for filename in sorted(files - referenced):
+            problems.append(f"{folder}/{filename}: nenhum golpe do {MOVES_CSV} usa esta imagem")
+
+    characters = []
+    for lineno, row in enumerate(_read_csv(sources[CHARS_CSV]), 2):
+        character = (row.get("Character") or "").strip()
+        raw = (row.get("Moves") or "").strip()
+        char_moves = [] if not raw or raw == "null" else [m.strip() for m in raw.split(",") if m.strip()]
+        for m in char_moves:
+            # CharMoves usa a chave do arquivo (R9_SEN_Lars.png -> SEN_Lars) ou a do CSV
+            if m not in file_keys and m.upper() not in seen:
+                problems.append(f"{CHARS_CSV}:{lineno}: {character}: golpe {m} não existe")
+        characters.append([character, char_moves])
+
+    stamps = {}
+    for key, path in sources.items():
+        stamps[key] = _stamp(path) + [_digest(path)]
+    return {
+        "version": DB_VERSION,
+        "sources": stamps,
+        "moves": moves,
+        "characters": characters,
+        "problems": problems,
+    }
+
+
+def _write(data, path):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def _freshness(data, sources):
+    """"fresh" (nada mudou), "touched" (só mtime mudou; mesmo hash) ou "stale"."""
+    if data.get("version") != DB_VERSION or set(data.get("sources", {})) != set(sources):
+        return "stale"
+    state = "fresh"
+    for key, path in sources.items():
+        old = data["sources"][key]
+        if _stamp(path) == old[:2]:
+            continue
+        if _digest(path) != old[2]:
+            return "stale"
+        state = "touched"
+    return state
+
+
+def build(path=None, force=False):
+    """Recompila se alguma fonte mudou. Devolve (dados, "built" | "touched" | "fresh")."""
+    path = path or resource_path("data", DB_FILE)
+    sources = _source_paths()
+    data = None
+    if not force and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        state = _freshness(data, sources)
+        if state == "fresh":
+            return data, state
+        if state == "touched":
+            data["sources"] = {k: _stamp(p) + [data["sources"][k][2]] for k, p in sources.items()}
+            _write(data, path)
+            return data, state
+    data = compile_database(sources)
+    _write(data, path)
+    return data, "built"
+
+
+# ---------- Runtime ----------
+class NotationDatabase:
+    """Golpes e personagens carregados do arquivo compilado."""
+
+    def __init__(self, data):
+        self.version = data["version"]
+        self.moves = [Move(*m) for m in data["moves"]]
+        self.characters = {name: moves for name, moves in data["characters"]}
+        self.problems = data.get("problems", [])
+        self.move_to_image = {m.move.upper(): m.image for m in self.moves}
+        self.move_to_name = {m.move.upper(): m.name for m in self.moves}
+
+    def character_moves(self, character):
+        """Chaves dos golpes do personagem ([] se não tiver)."""
+        return self.characters.get(character, [])
+
+    # formato das linhas do CSV, para quem ainda recebe move_dict/char_moves
+    def move_rows(self):
+        return [{"Move": m.move, "Name": m.name, "Image": m.image} for m in self.moves]
+
+    def char_rows(self):
+        return [{"Character": name, "Moves": ", ".join(moves) if moves else "null"}
+                for name, moves in self.characters.items()]
+
+
+_db = None
+_db_lock = threading.Lock()
+
+
+def load_database(path=None):
+    """Banco compartilhado (uma leitura). Fora do executável, recompila antes se os CSVs mudaram."""
+    global _db
+    with _db_lock:
+        if _db is None:
+            path = path or resource_path("data", DB_FILE)
+            if getattr(sys, "frozen", False) and os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+            else:
+                try:
+                    data, _ = build(path)
+                except OSError:     # pasta somente leitura: compila só em memória
+                    data = compile_database()
+            _db = NotationDatabase(data)
+        return _db
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Compila e valida data/notation_db.json.")
+    ap.add_argument("--force", action="store_true", help="recompila mesmo sem mudanças")
+    ap.add_argument("--strict", action="store_true", help="exit 1 se houver problemas")
+    args = ap.parse_args(argv)
+
+    data, state = build(force=args.force)
+    label = {"built": "compilado", "touched": "sem mudanças (só mtime)", "fresh": "atualizado"}[state]
+    print(f"{DB_FILE}: {label}; {len(data['moves'])} golpes, {len(data['characters'])} personagens")
+    for problem in data["problems"]:
+        print(f"  ! {problem}")
+    return 1 if args.strict and data["problems"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""Modelo da notação em edição: linhas de IDs inteiros + histórico de desfazer/refazer.
+
+Cada imagem ("R1_01_0001.png", "char/King.png") vira um inteiro pequeno (`MoveIds`), e cada
+linha do preview é um `array('H')` (2 bytes por golpe). As linhas nunca são alteradas no
+lugar: uma edição troca linhas inteiras, então comparar/guardar uma linha é barato (igualdade
+de arrays em C; o mesmo objeto pode ser guardado no histórico e no estado do preview).
+
+O histórico guarda só o delta de cada edição (linhas removidas/inseridas a partir de um
+índice) numa fila circular limitada (`HISTORY_MAX`); desfazer/refazer aplica um delta. Cada
+delta leva também o texto da caixa de notação antes/depois (`text`), para a caixa voltar
+junto com o preview.
+Nomes de arquivo/caminhos só aparecem na borda: `lines()` para renderizar/exportar.
+"""
+from array import array
+from collections import deque, namedtuple
+
+HISTORY_MAX = 200       # edições guardadas para desfazer (as mais antigas saem)
+ROW_TYPECODE = "H"      # até 65535 imagens distintas
+
+# delta de uma edição: rows[start:start + len(inserted)] era `removed`; texto da caixa antes/depois
+Edit = namedtuple("Edit", "start removed inserted text_before text_after")
+
+
+class MoveIds:
+    """Tabela nome de imagem <-> inteiro (só cresce; compartilhada pelo processo)."""
+
+    def __init__(self):
+        self._ids = {}
+        self._names = []
+
+    def id(self, name):
+        i = self._ids.get(name)
+        if i is None:
+            i = self._ids[name] = len(self._names)
+            self._names.append(name)
+        return i
+
+    def name(self, i):
+        return self._names[i]
+
+    def __len__(self):
+        return len(self._names)
+
+
+MOVE_IDS = MoveIds()
+
+
+class NotationModel:
+    """Linhas da notação (arrays de IDs) com desfazer/refazer por deltas."""
+
+    def __init__(self, ids=MOVE_IDS, history=HISTORY_MAX):
+        self.ids = ids
+        self.rows = []                          # [array('H')] (não alterar no lugar)
+        self.text = ""                          # texto da caixa de notação que corresponde às linhas
+        self._undo = deque(maxlen=history)      # fila circular: a edição mais antiga sai sozinha
+        self._redo = []
+
+    # ---------- Leitura ----------
+    def lines(self):
+        """Linhas de nomes de imagem (para renderizar/exportar)."""
+        name = self.ids.name
+        return [[name(i) for i in row] for row in self.rows]
+
+    def is_empty(self):
+        return not any(self.rows)
+
+    def row(self, names):
+        """Nomes -> linha compacta (array de IDs)."""
+        return array(ROW_TYPECODE, map(self.ids.id, names))
+
+    # ---------- Edição ----------
+    def _apply(self, start, count, rows):
+        removed = tuple(self.rows[start:start + count])
+        self.rows[start:start + count] = rows
+        return removed
+
+    def _edit(self, start, count, rows, text=None):
+        """Troca rows[start:start+count] por `rows` e registra o delta (limpa o refazer).
+        `text`: novo texto da caixa (None = não muda; ex.: clique na palette)."""
+        removed = self._apply(start, count, rows)
+        after = self.text if text is None else text
+        self._undo.append(Edit(start, removed, tuple(rows), self.text, after))
+        self._redo.clear()
+        self.text = after
+
+    def set_lines(self, lines, text=None):
+        """Substitui tudo por `lines` (nomes), vindas do texto `text` da caixa. Só as linhas
+        diferentes entram no delta.
+
+        Devolve False se as linhas não mudaram (o texto é atualizado mesmo assim).
+        """
+        new = [self.row(line) for line in lines]
+        old = self.rows
+        n = min(len(old), len(new))
+        start = 0
+        while start < n and old[start] == new[start]:
+            start += 1
+        end = 0    # linhas iguais no fim
+        while end < n - start and old[-1 - end] == new[-1 - end]:
+            end += 1
+        if start == len(old) == len(new):
+            if text is not None:
+                self.text = text
+            return False
+        self._edit(start, len(old) - start - end, new[start:len(new) - end], text)
+        return True
+
+    def append(self, name):
+        """Acrescenta uma imagem ao fim da última linha (cria a primeira linha se preciso)."""
+        if self.rows:
+            last = self.rows[-1]
+            self._edit(len(self.rows) - 1, 1, [last + array(ROW_TYPECODE, (self.ids.id(name),))])
+        else:
+            self._edit(0, 0, [self.row((name,))])
+
+    def pop(self):
+        """Remove a última imagem (a linha some quando fica vazia). False se já estava vazio."""
+        if not self.rows:
+            return False
+        last = self.rows[-1]
+        self._edit(len(self.rows) - 1, 1, [last[:-1]] if len(last) > 1 else [])
+        return True
+
+    def clear(self):
+        """Esvazia as linhas e a caixa de texto."""
+        if not self.rows:
+            self.text = ""
+            return False
+        self._edit(0, len(self.rows), [], "")
+        return True
+
+    # ---------- Histórico ----------
+    def can_undo(self):
+        return bool(self._undo)
+
+    def can_redo(self):
+        return bool(self._redo)
+
+    def undo(self):
+        """Desfaz a última edição. False se não há o que desfazer."""
+        if not self._undo:
+            return False
+        edit = self._undo.pop()
+        self._apply(edit.start, len(edit.inserted), edit.removed)
+        self.text = edit.text_before
+        self._redo.append(edit)
+        return True
+
+    def redo(self):
+        if not self._redo:
+            return False
+        edit = self._redo.pop()
+        self._apply(edit.start, len(edit.removed), edit.inserted)
+        self.text = edit.text_after
+        self._undo.append(edit)
+        return True
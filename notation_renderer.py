@@ -0,0 +1,245 @@
+"""Renderização de notações sem GUI (não importa tkinter nem customtkinter).
+
+Uso:
+    r = NotationRenderer()
+    img = r.render("f f 2, d 1 2")          # PIL.Image RGBA
+    png = r.render_png("df 2 > ff 2", dark=True)
+"""
+import csv
+import io
+import os
+import re
+
+from PIL import Image, ImageChops, ImageStat
+
+from resources import resource_path
+from sprite_atlas import open_image, prescaled_image
+from notation_tokenizer import NotationTokenizer, IncrementalParser
+from image_cache import ImageCache, image_bytes
+from notation_db import load_database
+from output_profiles import OutputProfile, encode_image, get_profile
+
+# Tamanho do tile na exportação (px)
+TILE_SIZE = 80
+
+# orçamento padrão de cada cache do renderizador (imagens decodificadas / tiles redimensionados)
+CACHE_BYTES = 32 * 1024 * 1024
+
+# Variante escura derivada (quando não há _Dark). Nos pares claro/_Dark de assets/, só os
+# ícones em tons neutros (botões, direções) escurecem; os coloridos ficam iguais. Então: curva
+# (claro -> escuro) nos tons neutros de ícones quase todo neutros; os demais voltam intactos.
+# Pontos ajustados pelas médias dos pares existentes.
+DARK_CURVE = ((0, 14), (16, 23), (48, 46), (80, 65), (224, 110), (255, 150))
+DARK_TINT_BLUE = 8     # os _Dark têm um leve tom azulado
+NEUTRAL_SAT = 24       # max(R,G,B) - min(R,G,B) <= isto = tom neutro
+NEUTRAL_MIN = 0.9      # fração mínima de pixels visíveis neutros para escurecer o ícone
+
+
+def load_move_dict(path=None):
+    """Golpes como lista de dicts (Move/Name/Image): do banco compilado ou de um CSV dado."""
+    if path is None:
+        return load_database().move_rows()
+    with open(path, mode='r', encoding='utf-8') as file:
+        return [row for row in csv.DictReader(file, delimiter=';')]
+
+
+def dark_path(path):
+    """Caminho da variante escura (sufixo _Dark.png)."""
+    return path.replace(".png", "_Dark.png")
+
+
+def _curve_lut(points, shift=0):
+    lut = []
+    for v in range(256):
+        for (x0, y0), (x1, y1) in zip(points, points[1:]):
+            if v <= x1:
+                lut.append(min(255, round(y0 + (y1 - y0) * (v - x0) / (x1 - x0)) + shift))
+                break
+    return lut
+
+
+_DARK_LUT = _curve_lut(DARK_CURVE)
+_DARK_LUT_BLUE = _curve_lut(DARK_CURVE, DARK_TINT_BLUE)
+
+
+def recolor_dark(img):
+    """Variante escura de um tile RGBA claro (operações por canal do PIL, sem laço por pixel)."""
+    r, g, b, a = img.split()
+    hi = ImageChops.lighter(ImageChops.lighter(r, g), b)
+    lo = ImageChops.darker(ImageChops.darker(r, g), b)
+    neutral = ImageChops.subtract(hi, lo).point(lambda v: 255 if v <= NEUTRAL_SAT else 0)
+    visible = a.point(lambda v: 255 if v >= 128 else 0)
+    n_visible = ImageStat.Stat(visible).sum[0]
+    if not n_visible or ImageStat.Stat(ImageChops.multiply(neutral, visible)).sum[0] < NEUTRAL_MIN * n_visible:
+        return img
+    dark = Image.merge("RGBA", (r.point(_DARK_LUT), g.point(_DARK_LUT), b.point(_DARK_LUT_BLUE), a))
+    return Image.composite(dark, img, neutral)
+
+
+def output_base_name(character=None):
+    """Nome base do arquivo salvo a partir do personagem ("king", "devil_jin"...)."""
+    sel = (character or "").strip()
+    if sel and sel.lower() != "none":
+        return re.sub(r'[^a-z0-9]+', '_', sel.lower()).strip('_') or "notation"
+    return "notation"
+
+
+class NotationRenderer:
+    """Compõe notações em imagens, mantendo tiles decodificados em memória.
+
+    O cache guarda a imagem RGBA decodificada por caminho e, por (caminho, tamanho),
+    o tile já redimensionado junto com a máscara alfa usada no paste. Os dois são LRU
+    limitados por `cache_bytes` (ver `cache_stats()`).
+
+    Com `recolor_dark`, golpes sem arquivo _Dark ganham a variante escura derivada do
+    tile claro (`recolor_dark()`) em vez de ficarem em branco.
+    """
+
+    def __init__(self, assets="assets", tile_size=TILE_SIZE, move_dict=None, cache_bytes=CACHE_BYTES,
+                 recolor_dark=True):
+        self.assets = assets
+        self.tile_size = tile_size
+        self.recolor_dark = recolor_dark
+        rows = move_dict if move_dict is not None else load_move_dict()
+        self.move_to_image = {row["Move"].upper(): row["Image"] for row in rows}
+        self.tokenizer = NotationTokenizer(self.move_to_image)
+        self.parser = IncrementalParser(self.tokenizer)
+        self._paths = {}    # (assets, imagem) -> caminho
+        self._images = ImageCache(cache_bytes, "decoded")   # path -> PIL RGBA (ou None)
+        self._tiles = ImageCache(cache_bytes, "tiles")      # (path, size) -> (RGBA, máscara)
+
+    # ---------- Parsing ----------
+    def parse(self, notation):
+        """Notação (texto) -> ParseResult (nomes de imagem por linha + trechos desconhecidos).
+
+        Vírgula quebra linha; espaços são opcionais (casamento mais longo).
+        """
+        return self.parser.parse(notation)
+
+    def path(self, name):
+        """ID da imagem -> caminho no conjunto de assets atual.
+
+        IDs com pasta ("char/King.png") não dependem do tema.
+        """
+        key = (self.assets, name)
+        p = self._paths.get(key)
+        if p is None:
+            parts = name.split("/") if "/" in name else (self.assets, name)
+            p = self._paths[key] = resource_path(*parts)
+        return p
+
+    def resolve(self, lines):
+        """Linhas de nomes de imagem -> linhas de caminhos no conjunto de assets atual."""
+        path = self.path
+        return [[path(name) for name in line] for line in lines]
+
+    def paths(self, notation):
+        """Notação (texto) -> linhas de caminhos absolutos no conjunto de assets atual."""
+        return self.resolve(self.parse(notation).lines)
+
+    # ---------- Cache de tiles ----------
+    def image(self, path):
+        """Imagem RGBA decodificada (do atlas ou do PNG solto, arquivo já fechado)."""
+        return self._images.get_or_load(path, lambda: open_image(path))
+
+    def tile(self, path, size=None):
+        """(imagem, máscara) no tamanho pedido; None se o arquivo não existe."""
+        size = size or self.tile_size
+        key = (path, size)
+        cached = self._tiles.get(key)
+        if cached is not None:
+            return cached
+        # tamanhos da pirâmide do atlas já vêm redimensionados do build (sem LANCZOS em runtime)
+        img = prescaled_image(path, size)
+        if img is None:
+            img = self.image(path)
+        if img is None:
+            return None
+        if img.size != (size, size):
+            img = img.resize((size, size), Image.LANCZOS)
+        mask = img.getchannel("A")
+        return self._tiles.put(key, (img, mask), image_bytes(img) + image_bytes(mask))
+
+    def dark_tile(self, path, size=None):
+        """Tile da variante escura: arquivo _Dark; sem ele, derivado do claro (se `recolor_dark`)."""
+        t = self.tile(dark_path(path), size)
+        if t is not None or not self.recolor_dark:
+            return t
+        size = size or self.tile_size
+        key = (path, size, "recolor")
+        cached = self._tiles.get(key)
+        if cached is not None:
+            return cached
+        light = self.tile(path, size)
+        if light is None:
+            return None
+        img = recolor_dark(light[0])
+        return self._tiles.put(key, (img, light[1]), image_bytes(img))
+
+    def clear_cache(self):
+        self._images.clear()
+        self._tiles.clear()
+
+    def drop_assets(self, assets):
+        """Tira dos caches as imagens de um conjunto de assets (tema que saiu de uso)."""
+        def in_assets(key):
+            path = key if isinstance(key, str) else key[0]
+            return os.path.basename(os.path.dirname(path)) == assets
+        return self._images.discard(in_assets) + self._tiles.discard(in_assets)
+
+    def cache_stats(self):
+        """Contadores dos caches (hits/misses/evictions/bytes residentes)."""
+        return [self._images.stats(), self._tiles.stats()]
+
+    # ---------- Composição ----------
+    def _canvas(self, lines, size):
+        max_line_length = max((len(line) for line in lines), default=0)
+        return Image.new('RGBA', (max_line_length * size, len(lines) * size), (0, 0, 0, 0))
+
+    def compose(self, lines, dark=False, tile_size=None):
+        """Linhas de caminhos -> imagem combinada (uma linha da notação por linha de tiles)."""
+        size = tile_size or self.tile_size
+        combined = self._canvas(lines, size)
+        get_tile = self.dark_tile if dark else self.tile
+        for r, line in enumerate(lines):
+            x = 0
+            for p in line:
+                t = get_tile(p, size)
+                if t is not None:
+                    img, mask = t
+                    combined.paste(img, (x, r * size), mask=mask)
+                x += size
+        return combined
+
+    def compose_pair(self, lines, tile_size=None):
+        """Linhas -> (clara, escura) numa passada só: mesmo layout, cada posição resolvida uma vez."""
+        size = tile_size or self.tile_size
+        light, dark = self._canvas(lines, size), self._canvas(lines, size)
+        for r, line in enumerate(lines):
+            x = 0
+            for p in line:
+                t = self.tile(p, size)
+                if t is not None:
+                    light.paste(t[0], (x, r * size), mask=t[1])
+                t = self.dark_tile(p, size)
+                if t is not None:
+                    dark.paste(t[0], (x, r * size), mask=t[1])
+                x += size
+        return light, dark
+
+    def render(self, notation, dark=False, tile_size=None):
+        """Notação (texto ou linhas de caminhos) -> PIL.Image."""
+        lines = self.paths(notation) if isinstance(notation, str) else notation
+        return self.compose(lines, dark=dark, tile_size=tile_size)
+
+    def render_png(self, notation, dark=False, tile_size=None):
+        """Notação -> bytes PNG."""
+        buf = io.BytesIO()
+        self.render(notation, dark=dark, tile_size=tile_size).save(buf, format="PNG")
+        return buf.getvalue()
+
+    def render_encoded(self, notation, profile=None, dark=False):
+        """Notação -> EncodeResult(bytes, tamanho, segundos) no perfil de saída (nome ou OutputProfile)."""
+        if not isinstance(profile, OutputProfile):
+            profile = get_profile(profile)
+        return encode_image(self.render(notation, dark=dark, tile_size=profile.tile_size), profile)
@@ -0,0 +1,193 @@
+"""Tokenização das notações: trie sobre as chaves `Move` com casamento mais longo (greedy).
+
+Espaços são opcionais: "df2fh" -> DF 2 FH, "FF2>SEN3" -> F F 2 > SEN 3.
+Trechos que não casam com nenhuma chave viram `Unknown` com a posição no texto original
+(também as chaves que existem no CSV mas estão sem imagem).
+
+O greedy resolve quase tudo numa passada. Quando ele deixa um trecho desconhecido, a linha é
+refeita por programação dinâmica sobre a trie: a divisão com menos caracteres desconhecidos,
+e entre as empatadas a do casamento mais longo primeiro (a mesma que o greedy daria). Assim
+"fheat" vira F HEAT em vez de FH + "eat".
+"""
+from collections import namedtuple
+
+Token = namedtuple("Token", "start end key image")    # posições no texto digitado
+Unknown = namedtuple("Unknown", "start end text")
+ParseResult = namedtuple("ParseResult", "lines unknown changed")
+
+_END = None  # marcador de fim de chave no nó da trie
+
+
+class NotationTokenizer:
+    """Trie compilada a partir de {MOVE_EM_MAIÚSCULAS: imagem}."""
+
+    def __init__(self, move_to_image):
+        self.root = {}
+        for key, image in move_to_image.items():
+            image = (image or "").strip()
+            if not key:
+                continue
+            node = self.root
+            for ch in key.upper():
+                node = node.setdefault(ch, {})
+            node[_END] = (key.upper(), image)
+
+    def tokenize(self, text, offset=0):
+        """Texto de UMA linha -> (tokens, desconhecidos). `offset` soma às posições.
+
+        >>> t = NotationTokenizer({"F": "f.png", "FH": "fh.png", "HEAT": "heat.png"})
+        >>> [tok.key for tok in t.tokenize("fheat")[0]]
+        ['F', 'HEAT']
+        >>> [tok.key for tok in t.tokenize("fh f")[0]]
+        ['FH', 'F']
+        """
+        up = text.upper()
+        if len(up) != len(text):  # caracteres que mudam de tamanho no upper()
+            up = "".join(c.upper()[:1] for c in text)
+        tokens, unknown = self._greedy(text, up, offset)
+        if unknown:
+            # o greedy pode ter "comido" o começo de uma chave válida: refaz com a menor perda
+            tokens, unknown = self._min_unknown(text, up, offset)
+        return tokens, unknown
+
+    def _greedy(self, text, up, offset):
+        """Casamento mais longo a cada posição, sem voltar atrás."""
+        root = self.root
+        tokens, unknown = [], []
+        i, n = 0, len(up)
+        unk_start = None
+        while i < n:
+            ch = up[i]
+            if ch.isspace():
+                if unk_start is not None:
+                    unknown.append(Unknown(offset + unk_start, offset + i, text[unk_start:i]))
+                    unk_start = None
+                i += 1
+                continue
+
+            # casamento mais longo a partir de i
+            node, j, best = root, i, None
+            while j < n:
+                node = node.get(up[j])
+                if node is None:
+                    break
+                j += 1
+                if _END in node:
+                    best = (j, node[_END])
+
+            if best is None:
+                if unk_start is None:
+                    unk_start = i
+                i += 1
+                continue
+
+            if unk_start is not None:
+                unknown.append(Unknown(offset + unk_start, offset + i, text[unk_start:i]))
+                unk_start = None
+            end, (key, image) = best
+            if image:
+                tokens.append(Token(offset + i, offset + end, key, image))
+            else:  # chave conhecida sem imagem: consome o trecho, mas reporta
+                unknown.append(Unknown(offset + i, offset + end, text[i:end]))
+            i = end
+
+        if unk_start is not None:
+            unknown.append(Unknown(offset + unk_start, offset + n, text[unk_start:n]))
+        return tokens, unknown
+
+    def _matches(self, up, i):
+        """Chaves que casam a partir de i: [(fim, (chave, imagem))], a mais longa primeiro."""
+        found, node, j, n = [], self.root, i, len(up)
+        while j < n:
+            node = node.get(up[j])
+            if node is None:
+                break
+            j += 1
+            if _END in node:
+                found.append((j, node[_END]))
+        found.reverse()
+        return found
+
+    def _min_unknown(self, text, up, offset):
+        """Divisão da linha com menos caracteres desconhecidos (DP do fim para o começo)."""
+        n = len(up)
+        cost = [0] * (n + 1)       # caracteres desconhecidos de up[i:] na melhor divisão
+        step = [None] * n          # i -> (fim, (chave, imagem)) | None (caractere desconhecido/espaço)
+        for i in range(n - 1, -1, -1):
+            if up[i].isspace():
+                cost[i] = cost[i + 1]
+                continue
+            best, choice = cost[i + 1] + 1, None
+            for end, entry in self._matches(up, i):     # mais longa primeiro: vence os empates
+                c = cost[end] + (0 if entry[1] else end - i)
+                if c < best:
+                    best, choice = c, (end, entry)
+            cost[i], step[i] = best, choice
+
+        tokens, unknown = [], []
+        i, unk_start = 0, None
+        while i < n:
+            choice = None if up[i].isspace() else step[i]
+            if choice is None and not up[i].isspace():
+                if unk_start is None:
+                    unk_start = i
+                i += 1
+                continue
+            if unk_start is not None:
+                unknown.append(Unknown(offset + unk_start, offset + i, text[unk_start:i]))
+                unk_start = None
+            if choice is None:     # espaço
+                i += 1
+                continue
+            end, (key, image) = choice
+            if image:
+                tokens.append(Token(offset + i, offset + end, key, image))
+            else:
+                unknown.append(Unknown(offset + i, offset + end, text[i:end]))
+            i = end
+        if unk_start is not None:
+            unknown.append(Unknown(offset + unk_start, offset + n, text[unk_start:n]))
+        return tokens, unknown
+
+
+class IncrementalParser:
+    """Parser da caixa de texto: só re-tokeniza as linhas (separadas por vírgula) que mudaram.
+
+    O cache guarda, por texto de linha, os tokens com posição relativa; linhas iguais à
+    digitação anterior reaproveitam o resultado e só recebem o novo deslocamento.
+    """
+
+    def __init__(self, tokenizer):
+        self.tokenizer = tokenizer
+        self._cache = {}        # texto da linha -> (tokens, desconhecidos, nomes de imagem)
+        self._last_lines = []   # textos das linhas do último parse
+
+    def parse(self, text):
+        """Texto completo -> ParseResult(linhas de nomes de imagem, desconhecidos, índices alterados)."""
+        text = text or ""
+        cache, new_cache = self._cache, {}
+        lines, unknown, segments = [], [], []
+        pos = 0
+        for seg in text.split(","):
+            start = pos
+            pos += len(seg) + 1
+            if not seg.strip():
+                continue
+            entry = cache.get(seg) or new_cache.get(seg)
+            if entry is None:
+                tokens, unk = self.tokenizer.tokenize(seg)
+                entry = (tokens, unk, [t.image for t in tokens])
+            new_cache[seg] = entry
+            segments.append(seg)
+            lines.append(entry[2])
+            unknown.extend(Unknown(u.start + start, u.end + start, u.text) for u in entry[1])
+
+        last = self._last_lines
+        changed = [i for i, seg in enumerate(segments) if i >= len(last) or last[i] != seg]
+        self._cache = new_cache
+        self._last_lines = segments
+        return ParseResult(lines, unknown, changed)
+
+    def reset(self):
+        self._cache = {}
+        self._last_lines = []
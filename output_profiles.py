@@ -0,0 +1,78 @@
+"""Perfis de saída das imagens exportadas (formato, compressão, paleta e tamanho do tile).
+
+    fast   PNG RGBA, zlib nível 1            -> salvar rápido (F4)
+    small  PNG, paleta exata se couber em 256 cores, senão RGBA; compressão máxima
+    tiny   PNG com paleta de 256 cores (com perda; ~4x menor que RGBA)
+    web    WebP sem perda
+
+Nenhum perfil grava metadados (texto, ICC, EXIF): só os pixels.
+"""
+import io
+import time
+from collections import namedtuple
+
+from PIL import Image
+
+# palette: None (RGBA), "lossless" (só se houver <= 256 cores) ou "lossy" (quantiza para 256)
+OutputProfile = namedtuple("OutputProfile", "name format ext tile_size palette options")
+
+PROFILES = {
+    "fast": OutputProfile("fast", "PNG", ".png", 80, None, {"compress_level": 1}),
+    "small": OutputProfile("small", "PNG", ".png", 80, "lossless", {"optimize": True}),
+    "tiny": OutputProfile("tiny", "PNG", ".png", 80, "lossy", {"optimize": True}),
+    "web": OutputProfile("web", "WEBP", ".webp", 80, None, {"lossless": True, "quality": 80, "method": 4}),
+}
+DEFAULT_PROFILE = "fast"
+
+# resultado de encode_image/save_image
+EncodeResult = namedtuple("EncodeResult", "data nbytes seconds")
+
+
+def get_profile(name=None, tile_size=None):
+    """Perfil pelo nome (padrão: DEFAULT_PROFILE), opcionalmente com outro tamanho de tile."""
+    try:
+        profile = PROFILES[name or DEFAULT_PROFILE]
+    except KeyError:
+        raise ValueError(f"perfil desconhecido: {name!r} (use {', '.join(PROFILES)})") from None
+    return profile._replace(tile_size=tile_size) if tile_size else profile
+
+
+def _exact_palette(img):
+    """RGBA -> P com paleta RGBA idêntica, ou None se a imagem tem mais de 256 cores."""
+    colors = img.getcolors(256)
+    if colors is None:
+        return None
+    lut = {bytes(color): i for i, (_, color) in enumerate(colors)}
+    raw = img.tobytes()
+    out = Image.frombytes("P", img.size, bytes(lut[raw[i:i + 4]] for i in range(0, len(raw), 4)))
+    out.putpalette(b"".join(lut), rawmode="RGBA")
+    return out
+
+
+def _prepare(img, profile):
+    if img.mode != "RGBA":
+        img = img.convert("RGBA")
+    if profile.palette == "lossless":
+        return _exact_palette(img) or img
+    if profile.palette == "lossy":
+        return img.quantize(256, method=Image.Quantize.FASTOCTREE)
+    return img
+
+
+def encode_image(img, profile):
+    """Imagem -> EncodeResult(bytes, tamanho, segundos) no formato do perfil."""
+    t0 = time.perf_counter()
+    img = _prepare(img, profile)
+    img.info = {}    # nada de metadados herdados
+    buf = io.BytesIO()
+    img.save(buf, format=profile.format, **profile.options)
+    data = buf.getvalue()
+    return EncodeResult(data, len(data), time.perf_counter() - t0)
+
+
+def save_image(img, path, profile):
+    """Codifica e grava em `path`; devolve o EncodeResult (sem os bytes)."""
+    result = encode_image(img, profile)
+    with open(path, "wb") as f:
+        f.write(result.data)
+    return result._replace(data=None)
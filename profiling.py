@@ -0,0 +1,166 @@
+"""Instrumentação opcional do caminho interativo, gravada como trace do Chrome.
+
+Ligada por variável de ambiente ou flag (lidas no import, antes de as classes serem definidas):
+    T8N_TRACE=1 python AppNovo5.py               # grava t8n_trace.json ao lado do app
+    T8N_TRACE=lag.json python AppNovo5.py
+    python AppNovo5.py --trace  |  --trace=lag.json
+
+Abra o arquivo em chrome://tracing ou https://ui.perfetto.dev. O trace tem:
+- um bloco por chamada das funções marcadas com `@traced` (por thread);
+- contadores (`count`) e os das fontes registradas (`add_counter_source`, ex.: hits/misses dos
+  caches de imagem), amostrados ao fim de cada bloco externo;
+- criações/destruições de widgets Tk e de itens de imagem dos canvas (`install_tk_hooks`).
+
+Desligado, `traced` devolve a própria função (nenhum custo por chamada) e `count`/`mark` são
+funções vazias.
+"""
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+
+from resources import APP_DIR
+
+MAX_EVENTS = 200_000      # acima disso os eventos são descartados (contados em "dropped")
+DEFAULT_FILE = "t8n_trace.json"
+
+
+def _trace_path():
+    value = os.environ.get("T8N_TRACE")
+    for arg in sys.argv[1:]:
+        if arg == "--trace":
+            value = value or "1"
+        elif arg.startswith("--trace="):
+            value = arg.split("=", 1)[1]
+    if not value or value == "0":
+        return None
+    return os.path.join(APP_DIR, DEFAULT_FILE) if value == "1" else value
+
+
+TRACE_PATH = _trace_path()
+ENABLED = TRACE_PATH is not None
+
+_T0 = time.perf_counter()
+_events = []
+_counters = {}
+_sources = {}             # nome -> callable que devolve {contador: valor}
+_dropped = 0
+_local = threading.local()
+
+
+def _now_us():
+    return (time.perf_counter() - _T0) * 1e6
+
+
+def _emit(event):
+    global _dropped
+    if len(_events) < MAX_EVENTS:
+        _events.append(event)
+    else:
+        _dropped += 1
+
+
+def _sample_counters(ts):
+    pid = os.getpid()
+    if _counters:
+        _emit({"name": "counters", "ph": "C", "ts": ts, "pid": pid, "args": dict(_counters)})
+    for name, source in list(_sources.items()):
+        try:
+            values = source()
+        except Exception:
+            continue
+        _emit({"name": name, "ph": "C", "ts": ts, "pid": pid, "args": values})
+
+
+def _traced(name=None):
+    def wrap(fn):
+        label = name or fn.__qualname__
+
+        def traced_fn(*args, **kwargs):
+            depth = getattr(_local, "depth", 0)
+            _local.depth = depth + 1
+            start = _now_us()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                end = _now_us()
+                _local.depth = depth
+                _emit({"name": label, "ph": "X", "ts": start, "dur": end - start,
+                       "pid": os.getpid(), "tid": threading.get_ident()})
+                if depth == 0:
+                    _sample_counters(end)
+        traced_fn.__name__ = fn.__name__
+        traced_fn.__qualname__ = fn.__qualname__
+        traced_fn.__doc__ = fn.__doc__
+        traced_fn.__wrapped__ = fn
+        return traced_fn
+    return wrap
+
+
+def _count(name, n=1):
+    _counters[name] = _counters.get(name, 0) + n
+
+
+def _mark(name, **args):
+    _emit({"name": name, "ph": "i", "s": "p", "ts": _now_us(), "pid": os.getpid(),
+           "tid": threading.get_ident(), "args": args})
+
+
+def _noop_traced(name=None):
+    return lambda fn: fn
+
+
+def _noop(*args, **kwargs):
+    pass
+
+
+# API pública: versões reais só com o trace ligado
+traced = _traced if ENABLED else _noop_traced
+count = _count if ENABLED else _noop
+mark = _mark if ENABLED else _noop
+
+
+def add_counter_source(name, source):
+    """Registra `source()` -> {contador: valor}, amostrado junto com os contadores."""
+    if ENABLED:
+        _sources[name] = source
+
+
+def install_tk_hooks():
+    """Conta widgets Tk criados/destruídos e itens de imagem criados/apagados nos canvas."""
+    if not ENABLED:
+        return
+    import tkinter
+
+    def patch(cls, attr, counter):
+        original = getattr(cls, attr)
+
+        def hooked(self, *args, **kwargs):
+            _count(counter)
+            return original(self, *args, **kwargs)
+        setattr(cls, attr, hooked)
+
+    patch(tkinter.BaseWidget, "_setup", "tk.widgets_created")
+    patch(tkinter.BaseWidget, "destroy", "tk.widgets_destroyed")
+    patch(tkinter.Canvas, "create_image", "tk.canvas_images_created")
+    patch(tkinter.Canvas, "delete", "tk.canvas_deletes")
+
+
+def write_trace(path=None):
+    """Grava o trace (formato JSON do Chrome). Chamado sozinho na saída do processo."""
+    path = path or TRACE_PATH
+    _sample_counters(_now_us())
+    data = {
+        "traceEvents": list(_events),
+        "displayTimeUnit": "ms",
+        "otherData": {"counters": dict(_counters), "dropped_events": _dropped},
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+    return path
+
+
+if ENABLED:
+    atexit.register(write_trace)
@@ -0,0 +1,253 @@
+"""Servidor HTTP local de renderização (sem Tk, só biblioteca padrão + PIL).
+
+    python render_server.py --port 8765 -j 4
+    python AppNovo5.py --serve --port 8765          # mesmo servidor, a partir do app/executável
+
+    GET  /render?notation=df2+fh+>+sen3&theme=assets&dark=1&size=80&profile=fast
+    POST /render?theme=assets_xbox                  # corpo = notação (texto)
+    GET  /metrics                                   # latência, taxa de acerto do cache, tempo de render
+    GET  /health
+
+A notação passa pelo mesmo tokenizer do app; a chave do cache é a notação normalizada
+(as imagens resolvidas) + tema + variante + tamanho + perfil, e o ETag é o hash dessa chave:
+um If-None-Match igual responde 304 sem renderizar. Os renders rodam num pool de processos.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from image_cache import ImageCache
+from notation_db import ASSET_SETS, load_database
+from notation_tokenizer import IncrementalParser, NotationTokenizer
+from output_profiles import PROFILES, DEFAULT_PROFILE, get_profile
+from resources import resource_path
+from theme_packs import BASE_THEME, is_installed
+
+MIN_SIZE, MAX_SIZE = 16, 256
+MAX_NOTATION = 4000          # caracteres
+CACHE_BYTES = 64 * 1024 * 1024
+LATENCY_WINDOW = 2000        # amostras guardadas para os percentis
+
+# renderizadores do processo worker, um por tema
+_renderers = {}
+
+
+def _render_in_worker(lines, theme, dark, size, profile_name):
+    """Worker: linhas de nomes de imagem -> (bytes, segundos de render+encode)."""
+    from notation_renderer import NotationRenderer
+
+    t0 = time.perf_counter()
+    renderer = _renderers.get(theme)
+    if renderer is None:
+        renderer = _renderers[theme] = NotationRenderer(theme)
+    paths = [[resource_path(theme, name) for name in line] for line in lines]
+    profile = get_profile(profile_name, size)
+    data = renderer.render_encoded(paths, profile, dark=dark).data
+    return data, time.perf_counter() - t0
+
+
+def _percentile(samples, q):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+
+
+class RenderService:
+    """Parsing, cache de respostas, deduplicação de renders em andamento e métricas."""
+
+    def __init__(self, workers=None, cache_bytes=CACHE_BYTES):
+        self.tokenizer = NotationTokenizer(load_database().move_to_image)
+        self.cache = ImageCache(cache_bytes, "http")
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        self._inflight = {}           # chave -> Future (mesma notação pedida ao mesmo tempo)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.not_modified = 0
+        self.errors = 0
+        self.latency_ms = deque(maxlen=LATENCY_WINDOW)
+        self.render_ms = deque(maxlen=LATENCY_WINDOW)
+
+    def normalize(self, notation):
+        """Notação -> (linhas de nomes de imagem, desconhecidos) com o parser do app."""
+        result = IncrementalParser(self.tokenizer).parse(notation)
+        lines = tuple(tuple(line) for line in result.lines)
+        return lines, result.unknown
+
+    @staticmethod
+    def etag(key):
+        return '"' + hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:20] + '"'
+
+    def render(self, key):
+        """Bytes da imagem para a chave (cache -> render em andamento -> novo render)."""
+        data = self.cache.get(key)
+        if data is not None:
+            return data
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = self.pool.submit(_render_in_worker, *key)
+        try:
+            data, seconds = future.result()
+        finally:
+            if owner:
+                with self._lock:
+                    self._inflight.pop(key, None)
+        if owner:
+            self.render_ms.append(seconds * 1000)
+            self.cache.put(key, data, len(data))
+        return data
+
+    def record(self, started, status):
+        with self._lock:
+            self.requests += 1
+            if status == 304:
+                self.not_modified += 1
+            elif status >= 400:
+                self.errors += 1
+            self.latency_ms.append((time.perf_counter() - started) * 1000)
+
+    def metrics(self):
+        cache = self.cache.stats()
+        lookups = cache["hits"] + cache["misses"]
+        latency, render = list(self.latency_ms), list(self.render_ms)
+        return {
+            "requests": self.requests,
+            "not_modified": self.not_modified,
+            "errors": self.errors,
+            "latency_ms": {"p50": _percentile(latency, 0.5), "p95": _percentile(latency, 0.95),
+                           "max": round(max(latency, default=0.0), 3)},
+            "render_ms": {"count": len(render), "p50": _percentile(render, 0.5),
+                          "p95": _percentile(render, 0.95)},
+            "cache": dict(cache, hit_rate=round(cache["hits"] / lookups, 4) if lookups else 0.0),
+        }
+
+
+class RenderHandler(BaseHTTPRequestHandler):
+    server_version = "T8Notation/1"
+    service = None    # RenderService (definido em serve())
+
+    def log_message(self, fmt, *args):   # sem log por requisição no stderr
+        pass
+
+    def _send(self, status, body=b"", content_type="text/plain; charset=utf-8", headers=()):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        if status != 304:
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if status != 304 and self.command != "HEAD":
+            self.wfile.write(body)
+        return status
+
+    def _error(self, status, message):
+        return self._send(status, json.dumps({"error": message}).encode("utf-8"), "application/json")
+
+    def do_GET(self):
+        self._handle()
+
+    def do_POST(self):
+        self._handle()
+
+    def _handle(self):
+        started = time.perf_counter()
+        try:
+            status = self._route()
+        except Exception as e:
+            status = self._error(500, f"{type(e).__name__}: {e}")
+        self.service.record(started, status)
+
+    def _route(self):
+        url = urlparse(self.path)
+        if url.path == "/health":
+            return self._send(200, b"ok")
+        if url.path == "/metrics":
+            return self._send(200, json.dumps(self.service.metrics()).encode("utf-8"), "application/json")
+        if url.path != "/render":
+            return self._error(404, "use /render, /metrics ou /health")
+
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        notation = query.get("notation", "")
+        if self.command == "POST":
+            length = int(self.headers.get("Content-Length") or 0)
+            notation = self.rfile.read(min(length, MAX_NOTATION * 4)).decode("utf-8", "replace")
+        if not notation.strip() or len(notation) > MAX_NOTATION:
+            return self._error(400, f"notation vazia ou com mais de {MAX_NOTATION} caracteres")
+
+        theme = query.get("theme", BASE_THEME)
+        if theme not in ASSET_SETS:
+            return self._error(400, f"theme deve ser um de: {', '.join(ASSET_SETS)}")
+        if not is_installed(theme):   # sem pacote/atlas/pasta: renderizaria um PNG em branco
+            return self._error(404, f"tema {theme} não instalado")
+        profile = query.get("profile", DEFAULT_PROFILE)
+        if profile not in PROFILES:
+            return self._error(400, f"profile deve ser um de: {', '.join(PROFILES)}")
+        dark = query.get("dark", "0").lower() in ("1", "true", "yes")
+        try:
+            size = int(query.get("size", PROFILES[profile].tile_size))
+        except ValueError:
+            size = 0
+        if not MIN_SIZE <= size <= MAX_SIZE:
+            return self._error(400, f"size deve estar entre {MIN_SIZE} e {MAX_SIZE}")
+
+        lines, unknown = self.service.normalize(notation)
+        if not any(lines):
+            return self._error(400, "nenhum comando reconhecido")
+        key = (lines, theme, dark, size, profile)
+        etag = self.service.etag(key)
+        headers = [("ETag", etag), ("Cache-Control", "public, max-age=86400")]
+        if unknown:
+            headers.append(("X-Unknown-Tokens", ",".join(u.text for u in unknown)[:200]))
+        if etag in (self.headers.get("If-None-Match") or ""):
+            return self._send(304, headers=headers)
+
+        data = self.service.render(key)
+        content_type = "image/webp" if PROFILES[profile].format == "WEBP" else "image/png"
+        return self._send(200, data, content_type, headers)
+
+    do_HEAD = do_GET
+
+
+def serve(host="127.0.0.1", port=8765, workers=None, cache_bytes=CACHE_BYTES):
+    service = RenderService(workers, cache_bytes)
+    handler = type("Handler", (RenderHandler,), {"service": service})
+    httpd = ThreadingHTTPServer((host, port), handler)
+    httpd.daemon_threads = True
+    print(f"Servindo em http://{host}:{httpd.server_address[1]}/render "
+          f"({service.workers} processo(s) de render)", file=sys.stderr)
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        service.pool.shutdown(cancel_futures=True)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Servidor HTTP local que renderiza notações.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1,
+                    help="processos de renderização")
+    ap.add_argument("--cache-mb", type=int, default=CACHE_BYTES // (1024 * 1024),
+                    help="memória do cache de respostas")
+    args = ap.parse_args(argv)
+    serve(args.host, args.port, args.workers, args.cache_mb * 1024 * 1024)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
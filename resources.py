@@ -0,0 +1,17 @@
+import sys, os
+
+
+def resource_path(*parts):
+    """Caminho de recursos empacotados (PyInstaller)."""
+    base = getattr(sys, "_MEIPASS", None)
+    if base:  # executável (onefile/onefolder)
+        return os.path.join(base, *parts)
+    # dev / rodando via .py
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), *parts)
+
+# Onde SALVAR (persistente). Escolha UMA das opções:
+# 1) ao lado do .exe / projeto:
+APP_DIR = (os.path.dirname(os.path.abspath(sys.executable))
+           if getattr(sys, "frozen", False)
+           else os.path.dirname(os.path.abspath(__file__)))
+SAVE_DIR = os.path.join(APP_DIR, "Saved Notations")
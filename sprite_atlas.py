@@ -0,0 +1,337 @@
+"""Atlas de sprites: cada pasta de imagens (assets/, char/) vira um PNG + um índice JSON.
+
+Build (antes do PyInstaller):
+    python sprite_atlas.py                 # gera atlas/assets.* e atlas/char.*
+    python sprite_atlas.py assets_xbox     # só as pastas pedidas
+    python sprite_atlas.py --no-dark       # sem os _Dark (o renderizador deriva a variante escura)
+    python sprite_atlas.py --force         # refaz tudo (ignora o manifesto)
+
+Além da folha de 80 px, o build gera uma folha por tamanho que a UI pede em 1x (pirâmide:
+PYRAMID_SIZES = image_cache.SIZE_BUCKETS), já redimensionada com LANCZOS. Outros tamanhos
+(HiDPI) são redimensionados em runtime uma vez e ficam no cache do renderizador: uma pirâmide
+com os 2x deixava o atlas/ maior (~11 MB) que os PNGs soltos que ele substitui (~6,7 MB). O
+JSON de cada pasta é o manifesto (tamanhos, folhas, hash de cada fonte); um novo build só
+redimensiona as fontes alteradas e apaga folhas de tamanhos que saíram da pirâmide.
+
+Em runtime, `open_image(path)` devolve o tile recortado do atlas e `prescaled_image(path, px)`
+o tile já no tamanho da pirâmide, ou None para outros tamanhos (cada folha é decodificada uma
+vez); se não houver atlas para a pasta, cai no PNG solto.
+"""
+import hashlib
+import io
+import json
+import os
+import sys
+import threading
+import zipfile
+
+from PIL import Image
+
+from image_cache import SIZE_BUCKETS
+from resources import resource_path
+
+ATLAS_DIR = "atlas"
+PACK_DIR = "themes"      # pacotes de tema (theme_packs.py): o atlas de uma pasta dentro de um .zip
+ATLAS_VERSION = 2
+ATLAS_TILE = 80          # = TILE_SIZE da exportação; todos os usos são quadrados
+ATLAS_COLS = 24
+# tamanhos pré-escalados: só os que a UI pede em 1x (palette 24/28/32, retrato 48) + export (tile)
+PYRAMID_SIZES = SIZE_BUCKETS
+DEFAULT_FOLDERS = ("assets", "char")
+
+
+# ---------- Build ----------
+def _light_name_for_dark(dark_name, light_names):
+    """Acha o arquivo claro de um _Dark (ex.: R3_01_b_H_Dark.png -> R3_01_bH.png)."""
+    name = dark_name.replace("_Dark", "")
+    if name in light_names:
+        return name
+    squashed = name.replace("_", "")
+    for light in light_names:
+        if light.replace("_", "") == squashed:
+            return light
+    return None
+
+
+def _digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def _load_previous(folder, out_dir, tile, cols):
+    """Índice e folhas do build anterior (para reaproveitar tiles de fontes inalteradas)."""
+    index_path = os.path.join(out_dir, f"{folder}.json")
+    try:
+        with open(index_path, encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if index.get("version") != ATLAS_VERSION or index.get("tile") != tile or index.get("cols") != cols:
+        return None
+    return index
+
+
+def _sheet_name(folder, px, tile):
+    return f"{folder}.png" if px == tile else f"{folder}@{px}.png"
+
+
+def build_atlas(folder, out_dir=None, tile=ATLAS_TILE, cols=ATLAS_COLS, include_dark=True,
+                sizes=PYRAMID_SIZES, force=False):
+    """Empacota `folder` em <out_dir>/<folder>.png (+ uma folha por tamanho da pirâmide) e
+    <folder>.json (manifesto). Incremental: só fontes novas/alteradas são redimensionadas.
+    Devolve o índice."""
+    src_dir = resource_path(folder)
+    out_dir = out_dir or resource_path(ATLAS_DIR)
+    files = sorted(f for f in os.listdir(src_dir) if f.lower().endswith(".png"))
+    light = [f for f in files if "_Dark" not in f]
+    light_set = set(light)
+    dark_owner = {f: _light_name_for_dark(f, light_set) for f in files if "_Dark" in f} if include_dark else {}
+    sizes = sorted(set(sizes) | {tile})
+    sources = {f: _digest(os.path.join(src_dir, f)) for f in light + [d for d, o in dark_owner.items() if o]}
+
+    old = None if force else _load_previous(folder, out_dir, tile, cols)
+    if (old and old.get("sources") == sources and old.get("sizes") == sizes
+            and all(os.path.exists(os.path.join(out_dir, _sheet_name(folder, px, tile))) for px in sizes)):
+        old["unchanged"] = True
+        return old
+
+    # tiles do build anterior: arquivo -> retângulo (folhas abertas sob demanda)
+    old_rect, old_sheets = {}, {}
+    if old:
+        for f, (rect, dark_rect) in old["entries"].items():
+            old_rect[f] = rect
+            if dark_rect:
+                old_rect[f.replace(".png", "_Dark.png")] = dark_rect
+        for d, owner in dark_owner.items():
+            if owner and owner.replace(".png", "_Dark.png") in old_rect:
+                old_rect[d] = old_rect[owner.replace(".png", "_Dark.png")]
+
+    def old_tile(filename, px):
+        if px not in old_sheets:
+            path = os.path.join(out_dir, _sheet_name(folder, px, tile))
+            with Image.open(path) as sheet:
+                old_sheets[px] = sheet.convert("RGBA")
+        x, y = old_rect[filename][:2]
+        x, y = x // tile * px, y // tile * px
+        return old_sheets[px].crop((x, y, x + px, y + px))
+
+    # cada fonte vira um tile por tamanho (LANCZOS direto da fonte); tiles iguais compartilham posição
+    tiles, rect_of_bytes = [], {}
+    rescaled = 0
+
+    def place(filename):
+        nonlocal rescaled
+        pyramid = None
+        if old and old["sources"].get(filename) == sources[filename] and filename in old_rect \
+                and old.get("sizes") == sizes:
+            try:
+                pyramid = {px: old_tile(filename, px) for px in sizes}
+            except OSError:
+                pyramid = None
+        if pyramid is None:
+            with Image.open(os.path.join(src_dir, filename)) as src:
+                img = src.convert("RGBA")
+            pyramid = {px: img if img.size == (px, px) else img.resize((px, px), Image.LANCZOS)
+                       for px in sizes}
+            rescaled += 1
+        key = pyramid[tile].tobytes()
+        if key not in rect_of_bytes:
+            i = len(tiles)
+            rect_of_bytes[key] = [(i % cols) * tile, (i // cols) * tile, tile, tile]
+            tiles.append(pyramid)
+        return rect_of_bytes[key]
+
+    entries = {f: [place(f), None] for f in light}
+    for f, owner in dark_owner.items():
+        if owner:
+            entries[owner][1] = place(f)
+
+    rows = max(1, (len(tiles) + cols - 1) // cols)
+    os.makedirs(out_dir, exist_ok=True)
+    for px in sizes:
+        sheet = Image.new("RGBA", (cols * px, rows * px), (0, 0, 0, 0))
+        for i, pyramid in enumerate(tiles):
+            sheet.paste(pyramid[px], ((i % cols) * px, (i // cols) * px))
+        # optimize só na folha base: nas outras custa ~6x o tempo para ~2% de tamanho
+        sheet.save(os.path.join(out_dir, _sheet_name(folder, px, tile)), optimize=px == tile)
+    # folhas de tamanhos que saíram da pirâmide não vão mais para o bundle
+    current = {_sheet_name(folder, px, tile) for px in sizes}
+    for name in os.listdir(out_dir):
+        if name.startswith(f"{folder}@") and name.endswith(".png") and name not in current:
+            os.remove(os.path.join(out_dir, name))
+
+    index = {
+        "version": ATLAS_VERSION, "tile": tile, "cols": cols,
+        "image": _sheet_name(folder, tile, tile),
+        "sizes": sizes,
+        "sheets": {str(px): _sheet_name(folder, px, tile) for px in sizes},
+        "sources": sources,
+        "entries": entries,
+    }
+    with open(os.path.join(out_dir, f"{folder}.json"), "w", encoding="utf-8") as f:
+        json.dump(index, f, separators=(",", ":"))
+    index["rescaled"] = rescaled
+    return index
+
+
+# ---------- Runtime ----------
+class SpriteAtlas:
+    """Atlas de uma pasta: índice em memória e folhas (uma por tamanho) decodificadas sob demanda."""
+
+    def __init__(self, folder, index, source):
+        """`source`: pasta com as folhas ou o .zip do pacote de tema que as contém."""
+        self.folder = folder
+        self.entries = index["entries"]
+        self.tile = index["tile"]
+        self.sizes = tuple(index.get("sizes", (self.tile,)))
+        self._source = source
+        self._sheet_names = {int(px): name for px, name in index.get("sheets", {}).items()}
+        self._sheet_names[self.tile] = index["image"]
+        self._sheets = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, folder):
+        """Atlas da pasta (atlas/ ou pacote themes/<pasta>.zip) ou None se não há build."""
+        index_path = resource_path(ATLAS_DIR, f"{folder}.json")
+        pack_path = resource_path(PACK_DIR, f"{folder}.zip")
+        if os.path.exists(index_path):
+            with open(index_path, encoding="utf-8") as f:
+                index = json.load(f)
+            source = resource_path(ATLAS_DIR)
+        elif os.path.exists(pack_path):
+            with zipfile.ZipFile(pack_path) as zf:
+                index = json.loads(zf.read(f"{folder}.json"))
+            source = pack_path
+        else:
+            return None
+        if index.get("version") != ATLAS_VERSION:
+            return None
+        return cls(folder, index, source)
+
+    def names(self):
+        """Nomes dos arquivos claros empacotados (equivalente ao listdir sem _Dark)."""
+        return sorted(self.entries)
+
+    def _rect(self, filename):
+        if filename in self.entries:
+            return self.entries[filename][0]
+        if filename.endswith("_Dark.png"):
+            entry = self.entries.get(filename[:-len("_Dark.png")] + ".png")
+            if entry:
+                return entry[1]
+        return None
+
+    def has(self, filename):
+        return self._rect(filename) is not None
+
+    def _open(self, name):
+        if self._source.endswith(".zip"):
+            with zipfile.ZipFile(self._source) as zf:
+                return io.BytesIO(zf.read(name))
+        return open(os.path.join(self._source, name), "rb")
+
+    def _sheet(self, px):
+        with self._lock:
+            sheet = self._sheets.get(px)
+            if sheet is None:
+                with self._open(self._sheet_names[px]) as f, Image.open(f) as src:
+                    sheet = self._sheets[px] = src.convert("RGBA")
+            return sheet
+
+    def get(self, filename, size=None):
+        """Sub-imagem RGBA (cópia independente) ou None. `size` fora da pirâmide devolve None."""
+        rect = self._rect(filename)
+        px = size or self.tile
+        if rect is None or px not in self._sheet_names:
+            return None
+        x, y = rect[0] // self.tile * px, rect[1] // self.tile * px
+        return self._sheet(px).crop((x, y, x + px, y + px))
+
+
+_atlases = {}
+_atlases_lock = threading.Lock()
+
+
+def get_atlas(folder):
+    """Atlas carregado (cache por pasta; None se não existe)."""
+    with _atlases_lock:
+        if folder not in _atlases:
+            _atlases[folder] = SpriteAtlas.load(folder)
+        return _atlases[folder]
+
+
+def release_atlas(folder):
+    """Tira o atlas da pasta da memória (folhas decodificadas); o próximo uso carrega de novo."""
+    with _atlases_lock:
+        _atlases.pop(folder, None)
+
+
+def list_images(folder):
+    """Arquivos claros de uma pasta de imagens (atlas; fallback: listdir)."""
+    atlas = get_atlas(folder)
+    if atlas is not None:
+        return atlas.names()
+    folder_dir = resource_path(folder)
+    if not os.path.isdir(folder_dir):
+        return []
+    return sorted(f for f in os.listdir(folder_dir)
+                  if f.lower().endswith(".png") and "_Dark" not in f)
+
+
+def list_dark_pairs(folder):
+    """{arquivo claro: arquivo _Dark} da pasta (atlas; fallback: listdir com o mesmo pareamento do build)."""
+    atlas = get_atlas(folder)
+    if atlas is not None:
+        return {f: f.replace(".png", "_Dark.png") for f, (_, dark) in atlas.entries.items() if dark}
+    folder_dir = resource_path(folder)
+    if not os.path.isdir(folder_dir):
+        return {}
+    files = [f for f in os.listdir(folder_dir) if f.lower().endswith(".png")]
+    light = {f for f in files if "_Dark" not in f}
+    pairs = {}
+    for f in files:
+        if "_Dark" in f:
+            owner = _light_name_for_dark(f, light)
+            if owner:
+                pairs[owner] = f
+    return pairs
+
+
+def open_image(path):
+    """Imagem RGBA para um caminho de recurso: atlas da pasta ou PNG solto; None se não existe."""
+    folder_dir, filename = os.path.split(path)
+    atlas = get_atlas(os.path.basename(folder_dir))
+    if atlas is not None:
+        img = atlas.get(filename)
+        if img is not None:
+            return img
+    if not os.path.exists(path):
+        return None
+    with Image.open(path) as src:
+        return src.convert("RGBA")
+
+
+def prescaled_image(path, size):
+    """Tile já redimensionado do atlas, ou None se não há atlas/tamanho (sem tocar no disco)."""
+    folder_dir, filename = os.path.split(path)
+    atlas = get_atlas(os.path.basename(folder_dir))
+    return atlas.get(filename, size) if atlas is not None else None
+
+
+def image_exists(path):
+    folder_dir, filename = os.path.split(path)
+    atlas = get_atlas(os.path.basename(folder_dir))
+    return (atlas is not None and atlas.has(filename)) or os.path.exists(path)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    include_dark = "--no-dark" not in args
+    for folder in ([a for a in args if not a.startswith("--")] or DEFAULT_FOLDERS):
+        idx = build_atlas(folder, include_dark=include_dark, force="--force" in args)
+        if idx.get("unchanged"):
+            print(f"{folder}: sem alterações")
+            continue
+        print(f"{folder}: {len(idx['entries'])} imagens, {idx['rescaled']} redimensionada(s) -> "
+              f"{ATLAS_DIR}/{folder}.png + {len(idx['sizes']) - 1} tamanho(s) {idx['sizes']}")
@@ -0,0 +1,85 @@
+"""Pacotes de tema: os mesmos IDs de golpe (nome da imagem, ex.: R1_01_0001.png) com a arte
+de cada tema (T8 Default / Xbox / PlayStation).
+
+Build (a pasta de origem usa os mesmos nomes de arquivo de assets/):
+    python theme_packs.py assets_xbox --name Xbox
+    python theme_packs.py assets_ps --name PlayStation
+
+Um pacote é um themes/<pasta>.zip autocontido: o atlas da pasta (folhas da pirâmide + índice
+ID -> retângulo, ver sprite_atlas.py) e o theme.json (nome do tema). O estado do app guarda
+IDs; o caminho de cada imagem sai do tema atual na hora de desenhar. O pacote só é lido na
+primeira vez que o tema é escolhido e sai da memória quando outro tema assume
+(`sprite_atlas.release_atlas`).
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import zipfile
+
+from resources import resource_path
+from sprite_atlas import ATLAS_DIR, PACK_DIR, build_atlas, list_images
+
+PACK_VERSION = 1
+MANIFEST = "theme.json"
+BASE_THEME = "assets"       # tema padrão: referência dos IDs (layout da palette, golpes por personagem)
+
+
+def pack_path(folder):
+    return resource_path(PACK_DIR, f"{folder}.zip")
+
+
+def is_installed(folder):
+    """Tema disponível: pacote .zip, atlas ou pasta solta."""
+    return (os.path.exists(pack_path(folder))
+            or os.path.exists(resource_path(ATLAS_DIR, f"{folder}.json"))
+            or os.path.isdir(resource_path(folder)))
+
+
+def installed_themes(catalog):
+    """(rótulo, pasta) do catálogo que estão instalados, na mesma ordem."""
+    return [(label, folder) for label, folder in catalog if is_installed(folder)]
+
+
+def build_pack(folder, name=None, out_dir=None):
+    """Empacota <folder>/ em <out_dir>/<folder>.zip.
+
+    Devolve (caminho, IDs do tema padrão que faltam no pacote).
+    """
+    out_dir = out_dir or resource_path(PACK_DIR)
+    path = os.path.join(out_dir, f"{folder}.zip")
+    with tempfile.TemporaryDirectory() as tmp:
+        index = build_atlas(folder, tmp, force=True)
+        manifest = {"version": PACK_VERSION, "folder": folder, "name": name or folder}
+        os.makedirs(out_dir, exist_ok=True)
+        # PNG já é comprimido: ZIP_STORED deixa a leitura de cada folha sem descompressão extra
+        with zipfile.ZipFile(path + ".tmp", "w", zipfile.ZIP_STORED) as zf:
+            zf.writestr(MANIFEST, json.dumps(manifest, separators=(",", ":")))
+            for filename in sorted(os.listdir(tmp)):
+                zf.write(os.path.join(tmp, filename), filename)
+        os.replace(path + ".tmp", path)
+    missing = [] if folder == BASE_THEME else sorted(set(list_images(BASE_THEME)) - set(index["entries"]))
+    return path, missing
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Gera o pacote de tema themes/<pasta>.zip.")
+    ap.add_argument("folders", nargs="+", help="pastas de imagens (ex.: assets_xbox assets_ps)")
+    ap.add_argument("--name", help="nome do tema (padrão: nome da pasta)")
+    args = ap.parse_args(argv)
+
+    for folder in args.folders:
+        if not os.path.isdir(resource_path(folder)):
+            print(f"{folder}: pasta não encontrada", file=sys.stderr)
+            return 1
+        path, missing = build_pack(folder, args.name)
+        print(f"{folder}: {os.path.relpath(path)} ({os.path.getsize(path) // 1024} KiB)")
+        if missing:
+            print(f"  ! {len(missing)} ID(s) do tema padrão sem imagem: {', '.join(missing[:10])}"
+                  + (" ..." if len(missing) > 10 else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""Dicas (tooltips) da janela inteira com um único popup.
+
+    tips = TooltipManager(root)
+    tips.register(botao, "Salvar PNG (F4)")     # widget com texto fixo
+    tips.schedule("Heaven's Wrath")             # item sob o ponteiro (ex.: ícone de um canvas)
+    tips.hide()
+
+Nenhum objeto por widget: os textos ficam num dicionário pelo nome Tk do widget (a entrada sai
+no <Destroy> dele) e todos os widgets usam os mesmos handlers. Quem desenha itens num canvas
+resolve o item sob o ponteiro e chama `schedule`/`hide`. O popup (um Toplevel + Label) é
+criado na primeira dica e depois só muda de texto/posição.
+"""
+import tkinter as tk
+
+DELAY_MS = 300
+OFFSET = (12, 16)         # posição do popup em relação ao ponteiro
+
+
+class TooltipManager:
+    """Um popup de dica compartilhado, com atraso, para a janela `root`."""
+
+    def __init__(self, root, delay=DELAY_MS):
+        self.root = root
+        self.delay = delay
+        self._texts = {}          # nome Tk do widget -> texto
+        self._job = None          # after pendente (dica agendada)
+        self._text = None         # texto agendado/mostrado
+        self._popup = None
+        self._label = None
+
+    # ---------- Widgets com texto fixo ----------
+    def register(self, widget, text):
+        """Mostra `text` ao parar o ponteiro sobre `widget` (widgets CTk ou Tk)."""
+        if str(widget) not in self._texts:
+            # CTk repassa bind() para os widgets internos (canvas/label do botão)
+            widget.bind("<Enter>", self._on_enter, add="+")
+            widget.bind("<Leave>", self._on_leave, add="+")
+            widget.bind("<ButtonPress>", self._on_leave, add="+")
+            tk.Misc.bind(widget, "<Destroy>", self._on_destroy, add="+")
+        self._texts[str(widget)] = text
+
+    def _lookup(self, widget):
+        """Texto do widget registrado que contém `widget` (sobe pelos mestres)."""
+        while widget is not None:
+            text = self._texts.get(str(widget))
+            if text is not None:
+                return text
+            widget = getattr(widget, "master", None)
+        return None
+
+    def _on_enter(self, event):
+        text = self._lookup(event.widget)
+        if text:
+            self.schedule(text)
+
+    def _on_leave(self, event=None):
+        self.hide()
+
+    def _on_destroy(self, event):
+        if self._texts.pop(str(event.widget), None) is not None:
+            self.hide()
+
+    # ---------- Popup ----------
+    def schedule(self, text):
+        """Mostra `text` depois do atraso (troca a dica agendada, se houver)."""
+        self._cancel()
+        self._text = text
+        self._job = self.root.after(self.delay, self._show)
+
+    def _cancel(self):
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+
+    def _show(self):
+        self._job = None
+        if self._popup is None:
+            self._popup = tk.Toplevel(self.root)
+            self._popup.wm_overrideredirect(True)
+            self._label = tk.Label(self._popup, justify="left", background="#ffffe0",
+                                   relief="solid", borderwidth=1)
+            self._label.pack(ipadx=1)
+        x = self.root.winfo_pointerx() + OFFSET[0]
+        y = self.root.winfo_pointery() + OFFSET[1]
+        self._label.configure(text=self._text)
+        self._popup.wm_geometry(f"+{x}+{y}")
+        self._popup.deiconify()
+        self._popup.lift()
+
+    def hide(self):
+        self._cancel()
+        self._text = None
+        if self._popup is not None:
+            self._popup.withdraw()
+
+    def count(self):
+        """Widgets registrados (diagnóstico)."""
+        return len(self._texts)
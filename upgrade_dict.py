@@ -1,56 +1,58 @@
 import os
 import csv
 
+from notation_db import build
+
 # Define the path to the CSV file
 movedict_csv = os.path.join(os.getcwd(), "data", "MoveDict.csv")
 modified_csv = os.path.join(os.getcwd(), "data", "MoveDictModified.csv")
 
-#read each .png file in the folder and return a list of the names
-def get_png_files(folder):
-    png_files = []
-    for file in os.listdir(folder):
-        if file.endswith(".png") and "_Dark" not in file:
-            png_files.append(file)
-    return png_files
-
-images = get_png_files("assets")
-# print("images:",images)
 
-#read each image name and filter the move name
-moves = []
-for image in images:
+def move_key(image):
+    """Golpe no nome da imagem: R5_02_BT.png -> BT, R7_50_AIR.png -> AIR (sem o prefixo Rn_ nn_)."""
     name = image[3:][:-4]
-    if "_Dark" in name:
-        continue
-    #if the first letter is a number, remove the first 3 characters
-    if name[0].isdigit():
+    if name[:1].isdigit():
         name = name[3:]
-    moves.append(name)
-# print("moves:",moves)
+    return name
 
-#make a dictionary with the moves as keys and the images as values
-move_dict = {}
-for move,image in zip(moves,images):
-    move_dict[move] = image
 
-print(move_dict)
+#read each .png file in the folder and map move -> image (no mesmo passo, sem zip de listas)
+def get_move_images(folder):
+    move_dict = {}
+    for file in sorted(os.listdir(folder)):
+        if file.endswith(".png") and "_Dark" not in file:
+            move_dict.setdefault(move_key(file), file)
+    return move_dict
+
+
+move_dict = get_move_images("assets")
 
 # Open the CSV file and read its contents
 new_csv = {}
-with open(movedict_csv, mode='r') as file:
+unmatched = []
+with open(movedict_csv, mode='r', encoding='utf-8') as file:
     csv_reader = csv.DictReader(file, delimiter=';')
-    
+
     # if the "move" column value is the same as the "move" on the move_dict, add the image to the new_csv
     for row in csv_reader:
         move = row["Move"]
-        if move in move_dict:
-            row["Image"] = move_dict[move]
+        row["Image"] = move_dict.get(move, "")
+        if not row["Image"]:
+            unmatched.append(move)
         new_csv[move] = row
 
 # Write the new CSV file
-with open(modified_csv, mode='w', newline='') as file:
+with open(modified_csv, mode='w', newline='', encoding='utf-8') as file:
     fieldnames = ["Move", "Name", "Image"]
     writer = csv.DictWriter(file, fieldnames=fieldnames, delimiter=';')
     writer.writeheader()
     for key in new_csv:
-        writer.writerow(new_csv[key])
\ No newline at end of file
+        writer.writerow(new_csv[key])
+
+if unmatched:
+    print("Sem imagem:", ", ".join(unmatched))
+
+# recompila o banco (valida golpes x assets e CharMoves x golpes)
+data, _ = build(force=True)
+for problem in data["problems"]:
+    print("  !", problem)